@@ -1,14 +1,26 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlmodel import Session
-from app.core.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.cache import LRUCache
+from app.core.config import USER_CACHE_SIZE, USER_CACHE_TTL
+from app.core.database import async_engine
 from app.core.security import SECRET_KEY, ALGORITHM
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+# Token subject (username) -> column snapshot of the User, so authenticated requests skip the user query
+user_cache = LRUCache(USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+def invalidate_user(username: str):
+    """
+    Call after changing a user's row (e.g. password reset) so the next request reloads it.
+    """
+    user_cache.pop(username)
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -21,8 +33,14 @@ def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Dep
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    user = session.query(User).filter(User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+
+    snapshot = user_cache.get(username)
+    if snapshot is None:
+        async with AsyncSession(async_engine) as session:
+            user = (await session.exec(select(User).where(User.username == username))).first()
+            if user is None:
+                raise credentials_exception
+            snapshot = user.dict()
+        user_cache.set(username, snapshot)
+    # A fresh detached instance per request, so callers can't mutate the cached copy
+    return User(**snapshot)
@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
-from app.core.database import get_session
-from app.core.security import verify_password, get_password_hash, create_access_token
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_session, get_async_session
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token
 from app.models.user import User
+from app.services.analytics_service import track_event
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -16,35 +18,39 @@ class UserCreate(BaseModel):
     username: str
     password: str
 
+async def _find_user(session: AsyncSession, username: str):
+    return (await session.exec(select(User).where(User.username == username))).first()
+
+# Auth handlers are async so bcrypt can be awaited in the hashing process pool and the
+# DB calls go through the async session, without holding a threadpool thread.
+
 @router.post("/register", response_model=Token)
-def register(user_in: UserCreate, session: Session = Depends(get_session)):
-    user = session.query(User).filter(User.username == user_in.username).first()
+async def register(user_in: UserCreate, session: AsyncSession = Depends(get_async_session)):
+    user = await _find_user(session, user_in.username)
     if user:
         raise HTTPException(
             status_code=400,
             detail="Username already registered"
         )
     
+    hashed_password = await get_password_hash_async(user_in.password)
     new_user = User(
         username=user_in.username,
-        hashed_password=get_password_hash(user_in.password)
+        hashed_password=hashed_password
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    await session.commit()
     
     # Track Registration
-    from app.models.analytics import AnalyticsEvent
-    session.add(AnalyticsEvent(event_type="REGISTER", user_id=new_user.id, path="/auth/register"))
-    session.commit()
+    track_event("REGISTER", user_id=new_user.id, path="/auth/register")
     
     access_token = create_access_token(data={"sub": new_user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
-    user = session.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_async_session)):
+    user = await _find_user(session, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -52,9 +58,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = D
         )
     
     # Track Login
-    from app.models.analytics import AnalyticsEvent
-    session.add(AnalyticsEvent(event_type="LOGIN", user_id=user.id, path="/auth/login"))
-    session.commit()
+    track_event("LOGIN", user_id=user.id, path="/auth/login")
 
     access_token = create_access_token(data={"sub": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -1,152 +1,137 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlmodel import Session, select
-from datetime import date, timedelta, datetime
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import func, extract
+from datetime import date, timedelta, datetime, timezone
 
-from app.core.database import get_session
+from app.core.database import get_session, get_async_session
+from app.core.cache import response_cache
 from app.api.deps import get_current_user
 from app.models.task import Task
 from app.models.daily_log import DailyLog
-from app.models.streak import Streak
-from app.models.reward import Reward
 from app.models.user import User
+from app.services.stats_service import get_user_stats, effective_current_streak
+from app.services.leaderboard_service import get_leaderboard_page
+from app.models.leaderboard import LeaderboardEntry
+from app.models.completion_bitmap import CompletionBitmap
+from app.services.bitmap_service import day_counts
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/")
-def get_dashboard(
-    session: Session = Depends(get_session),
+async def get_dashboard(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    today = date.today()
-
-    total_tasks = session.exec(select(Task).where(Task.user_id == current_user.id)).all()
-    active_tasks = session.exec(
-        select(Task).where(Task.is_active == True, Task.user_id == current_user.id)
-    ).all()
+    return await response_cache.respond(request, current_user.id, lambda: session.run_sync(dashboard_payload, current_user))
 
-    # Join with Task to filter by user
-    today_logs = session.exec(
-        select(DailyLog).join(Task).where(
-            DailyLog.log_date == today,
-            DailyLog.completed == True,
-            Task.user_id == current_user.id
-        )
-    ).all()
-    
-    # Total Completed All Time
-    completed_all_time = session.exec(
-        select(DailyLog).join(Task).where(
-            DailyLog.completed == True,
-            Task.user_id == current_user.id
-        )
-    ).all()
+def dashboard_payload(session: Session, current_user: User):
+    today = date.today()
 
-    # Calculate Global Streak (User Level)
-    # Get all unique dates where user completed at least one task
-    completed_dates = session.exec(
-        select(DailyLog.log_date)
-        .join(Task)
-        .where(
-            Task.user_id == current_user.id,
-            DailyLog.completed == True
-        )
-        .distinct()
-    ).all()
-    
-    # Sort dates descending
-    sorted_dates = sorted([d for d in completed_dates], reverse=True)
-    
-    current_streak = 0
-    if sorted_dates:
-        # Check if the most recent completion was today or yesterday
-        last_completion = sorted_dates[0]
-        today_date = date.today()
-        yesterday = today_date - timedelta(days=1)
-        
-        if last_completion == today_date or last_completion == yesterday:
-            current_streak = 1
-            # Check previous dates
-            check_date = last_completion - timedelta(days=1)
-            for d in sorted_dates[1:]:
-                if d == check_date:
-                    current_streak += 1
-                    check_date -= timedelta(days=1)
-                else:
-                    break
-        else:
-            # Streak broken
-            current_streak = 0
-            
-    rewards = session.exec(
-        select(Reward).join(Task).where(Task.user_id == current_user.id)
-    ).all()
+    # Counters are maintained on writes, so this is a primary-key lookup
+    stats = get_user_stats(session, current_user.id, today)
 
     return {
         "tasks": {
-            "total": len(total_tasks),
-            "active": len(active_tasks),
-            "completed_today": len(today_logs),
-            "unfinished_today": max(0, len(active_tasks) - len(today_logs)),
-            "completed_all_time": len(completed_all_time)
+            "total": stats.total_tasks,
+            "active": stats.active_tasks,
+            "completed_today": stats.completed_today,
+            "unfinished_today": max(0, stats.active_tasks - stats.completed_today),
+            "completed_all_time": stats.completed_all_time
         },
         "streaks": {
-            "active_streaks": current_streak, # Using global streak here
-            "longest_streak": current_streak  # Simplified for now
+            "active_streaks": effective_current_streak(stats, today), # Using global streak here
+            "longest_streak": stats.longest_streak
         },
         "rewards": {
-            "total_rewards": len(rewards)
+            "total_rewards": stats.total_rewards
         }
     }
 
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 class UserPublicStats(BaseModel):
     username: str
     tasks_completed: int
     active_streaks: int
+    rank: Optional[int] = None
 
 @router.get("/community", response_model=List[UserPublicStats])
-def get_community_leaderboard(session: Session = Depends(get_session)):
+async def get_community_leaderboard(
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_async_session)
+):
     """
-    Returns a public leaderboard of all users and their progress.
+    Returns a page of the public leaderboard, served from the periodically refreshed snapshot.
     """
-    users = session.exec(select(User)).all()
-    leaderboard = []
-    
-    for user in users:
-        # Count completed logs (Total impact)
-        # Note: This is an expensive N+1 query loop, but fine for prototype scale < 100 users.
-        completed_count = 0
-        user_tasks = session.exec(select(Task).where(Task.user_id == user.id)).all()
-        task_ids = [t.id for t in user_tasks]
-        
-        if task_ids:
-            completed_count = session.exec(
-                select(DailyLog).where(DailyLog.task_id.in_(task_ids), DailyLog.completed == True)
-            ).all()
-            completed_count = len(completed_count)
-            
-            # Count active streaks
-            active_streaks_count = session.exec(
-                select(Streak).where(Streak.task_id.in_(task_ids), Streak.current_streak > 0)
-            ).all()
-            active_streaks_count = len(active_streaks_count)
-        else:
-            active_streaks_count = 0
-
-        leaderboard.append(UserPublicStats(
-            username=user.username,
-            tasks_completed=completed_count,
-            active_streaks=active_streaks_count
-        ))
-    
-    # Sort by tasks completed
-    leaderboard.sort(key=lambda x: x.tasks_completed, reverse=True)
-    return leaderboard
+    return await session.run_sync(get_leaderboard_page, limit, offset)
+
+@router.get("/community/me", response_model=UserPublicStats)
+async def get_my_rank(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    entry = await session.get(LeaderboardEntry, current_user.id)
+    if entry:
+        return entry
+    # Registered after the last snapshot refresh: not ranked yet
+    stats = await session.run_sync(get_user_stats, current_user.id)
+    return UserPublicStats(
+        username=current_user.username,
+        tasks_completed=stats.completed_all_time,
+        active_streaks=0
+    )
+
+@router.get("/heatmap")
+async def get_heatmap(
+    request: Request,
+    task_id: Optional[int] = None,
+    year: Optional[int] = Query(None, ge=1, le=9999),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Dense per-day completion counts for a year, for one task or all of the user's tasks combined.
+    Served from the per-task-year completion bitmaps, never from DailyLog rows.
+    """
+    if year is None:
+        year = date.today().year
+    return await response_cache.respond(request, current_user.id, lambda: session.run_sync(heatmap_payload, current_user, task_id, year))
+
+def heatmap_payload(session: Session, current_user: User, task_id: Optional[int], year: int):
+    # Checked on a cache miss only: cached bodies are per user, so a hit is already authorized
+    if task_id is not None:
+        task = session.exec(select(Task.id).where(Task.id == task_id, Task.user_id == current_user.id)).first()
+        if not task:
+            raise HTTPException(status_code=404, detail="Task not found")
+    query = select(CompletionBitmap.bits).join(Task).where(
+        Task.user_id == current_user.id,
+        CompletionBitmap.year == year
+    )
+    if task_id is not None:
+        query = query.where(CompletionBitmap.task_id == task_id)
+    counts = day_counts(session.exec(query).all(), year)
+
+    return {
+        "year": year,
+        "task_id": task_id,
+        "start": date(year, 1, 1).isoformat(),
+        "counts": counts,
+        "max": max(counts),
+        "total": sum(counts)
+    }
 
-from app.models.analytics import AnalyticsEvent
+from app.services.analytics_service import event_totals, event_timeseries
+from app.services.export_service import (
+    EXPORT_TABLES, EXPORT_FORMATS, DEFAULT_EXPORT_TABLES, iter_export, new_cursor, format_cursor, parse_cursor,
+)
+from fastapi.responses import StreamingResponse
+
+MAX_TIMESERIES_POINTS = 2000
 
 @router.get("/admin/analytics")
 def get_admin_analytics(
@@ -160,55 +145,92 @@ def get_admin_analytics(
          # Simple hardcoded admin check for prototype
          return {"error": "Unauthorized"}
     
-    total_visits = session.query(AnalyticsEvent).filter(AnalyticsEvent.event_type == "APP_LOAD").count()
-    total_logins = session.query(AnalyticsEvent).filter(AnalyticsEvent.event_type == "LOGIN").count()
-    total_registrations = session.query(AnalyticsEvent).filter(AnalyticsEvent.event_type == "REGISTER").count()
-    
-    unique_users = session.query(User).count()
+    # Totals come from the daily rollup, not from scanning AnalyticsEvent
+    totals = event_totals(session)
+    unique_users = session.exec(select(func.count(User.id))).one()
 
     return {
-        "visits": total_visits,
-        "logins": total_logins,
-        "registrations": total_registrations,
+        "visits": totals.get("APP_LOAD", 0),
+        "logins": totals.get("LOGIN", 0),
+        "registrations": totals.get("REGISTER", 0),
         "total_users": unique_users
     }
 
+@router.get("/admin/analytics/timeseries")
+def get_admin_analytics_timeseries(
+    from_: Optional[datetime] = Query(None, alias="from", description="UTC start, defaults to 30 days (48 hours for hourly) before `to`"),
+    to: Optional[datetime] = Query(None, description="UTC end (exclusive), defaults to now"),
+    bucket: str = Query("day", description="hour or day"),
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Admin only: event counts per hour or day, served from the rollup tables.
+    """
+    if current_user.id != 1:
+         return {"error": "Unauthorized"}
+    if bucket not in ("hour", "day"):
+        raise HTTPException(status_code=400, detail="bucket must be 'hour' or 'day'")
+
+    # Timezone-aware values are converted; naive ones are taken as UTC like the stored timestamps
+    to = to or datetime.utcnow()
+    if to.tzinfo:
+        to = to.astimezone(timezone.utc).replace(tzinfo=None)
+    if from_ is None:
+        from_ = to - (timedelta(hours=48) if bucket == "hour" else timedelta(days=30))
+    elif from_.tzinfo:
+        from_ = from_.astimezone(timezone.utc).replace(tzinfo=None)
+    if from_ >= to:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    span = timedelta(hours=1) if bucket == "hour" else timedelta(days=1)
+    if (to - from_) / span > MAX_TIMESERIES_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TIMESERIES_POINTS} buckets per request")
+
+    return event_timeseries(session, bucket, from_, to)
+
 @router.get("/admin/export_data")
 def export_admin_data(
-    session: Session = Depends(get_session),
+    tables: Optional[str] = Query(None, description=f"Comma separated subset of {', '.join(EXPORT_TABLES)}"),
+    format: str = Query("json", description="json, ndjson or csv (csv takes a single table)"),
+    gzip: bool = Query(False, description="Compress the download with gzip"),
+    since: Optional[str] = Query(None, description="Cursor from a previous export: only rows changed since then"),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Exports all database data as JSON for the admin.
+    Exports database tables for the admin as a streamed download (passwords excluded).
+    Rows are read through a server-side cursor and written out as they arrive, so memory use
+    does not depend on table size. Every export returns a cursor (X-Export-Cursor header, and
+    "cursor" in json output); passing it back as `since` returns only rows changed after it.
     """
     if current_user.id != 1:
          return {"error": "Unauthorized"}
-    
-    users = session.exec(select(User)).all()
-    tasks = session.exec(select(Task)).all()
-    logs = session.exec(select(DailyLog)).all()
-    analytics = session.exec(select(AnalyticsEvent)).all()
-    
-    # helper to safely dump
-    def safe_dump(objs):
-        data = []
-        for o in objs:
-            d = o.dict()
-            if "hashed_password" in d:
-                del d["hashed_password"]
-            # Convert datetime to string
-            for k, v in d.items():
-                if isinstance(v, (date, datetime)):
-                    d[k] = v.isoformat()
-            data.append(d)
-        return data
 
-    return {
-        "users": safe_dump(users),
-        "tasks": safe_dump(tasks),
-        "logs": safe_dump(logs),
-        "analytics": safe_dump(analytics)
-    }
+    # Repeated names are exported once, in order of first mention
+    names = list(dict.fromkeys(t.strip() for t in tables.split(",") if t.strip())) if tables else DEFAULT_EXPORT_TABLES
+    unknown = [t for t in names if t not in EXPORT_TABLES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {EXPORT_FORMATS}")
+    if format == "csv" and len(names) != 1:
+        raise HTTPException(status_code=400, detail="csv exports exactly one table")
+    try:
+        since_at = parse_cursor(since) if since else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid since cursor")
+    cursor = new_cursor()
+
+    filename = f"daily_checklist_export_{names[0]}.csv" if format == "csv" else f"daily_checklist_export.{format}"
+    media_type = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}[format]
+    if gzip:
+        filename += ".gz"
+        media_type = "application/gzip"
+    # The generator opens its own session: the request's dependencies are torn down before streaming ends
+    return StreamingResponse(
+        iter_export(names, format, cursor, since_at, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Export-Cursor": format_cursor(cursor)},
+    )
 
 from app.ml.predictor import train_predictor_model, predict_task_success
 
@@ -238,26 +260,42 @@ def get_prediction(
         "message": msg
     }
 
+INSIGHT_WINDOWS = (7, 30, 90, 365)
+
 @router.get("/insights")
-def get_insights(
-    session: Session = Depends(get_session),
+async def get_insights(
+    request: Request,
+    window: int = Query(7, description="Trend window in days: 7, 30, 90 or 365"),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     """
     Returns statistical analysis of user behavior for visualization.
     """
-    # Fetch all completed tasks history
-    logs = session.exec(
-        select(DailyLog).join(Task).where(
+    if window not in INSIGHT_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {INSIGHT_WINDOWS}")
+    return await response_cache.respond(request, current_user.id, lambda: session.run_sync(insights_payload, current_user, window))
+
+def insights_payload(session: Session, current_user: User, window: int):
+    """
+    Every histogram is a GROUP BY in SQL, so no log rows are loaded into Python. Only the daily trend
+    is bounded by `window`; the weekday and category histograms still scan the user's whole completed history.
+    """
+
+    def completed_logs(*columns):
+        return select(*columns).select_from(DailyLog).join(Task).where(
             Task.user_id == current_user.id,
             DailyLog.completed == True
         )
-    ).all()
 
     # 1. Weekly Pattern (Productivity by Day of Week)
+    dow = extract("dow", DailyLog.log_date) # 0=Sun on both SQLite and Postgres
+    week_rows = session.exec(
+        completed_logs(dow, func.count(DailyLog.id)).group_by(dow)
+    ).all()
     week_stats = {0:0, 1:0, 2:0, 3:0, 4:0, 5:0, 6:0} # 0=Mon
-    for log in logs:
-        week_stats[log.log_date.weekday()] += 1
+    for d, cnt in week_rows:
+        week_stats[(int(d) + 6) % 7] = cnt
     
     weekly_chart = [
         {"day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"][k], "tasks": v} 
@@ -265,36 +303,38 @@ def get_insights(
     ]
 
     # 2. Category Distribution
-    tasks = session.exec(select(Task).where(Task.user_id == current_user.id)).all()
-    task_map = {t.id: t.category for t in tasks}
-    
-    cat_counts = {}
-    for log in logs:
-        cat = task_map.get(log.task_id, "Unknown")
-        cat_counts[cat] = cat_counts.get(cat, 0) + 1
-        
-    category_chart = [{"name": k, "value": v} for k, v in cat_counts.items()]
-
-    # 3. Trend Analysis (Last 7 days)
+    category_rows = session.exec(
+        completed_logs(Task.category, func.count(DailyLog.id)).group_by(Task.category)
+    ).all()
+    category_chart = [{"name": k, "value": v} for k, v in category_rows]
+
+    # 3. Trend Analysis (Last `window` days)
     today = date.today()
-    dates = [today - timedelta(days=i) for i in range(6, -1, -1)]
-    daily_counts = []
-    
-    for d in dates:
-        cnt = len([l for l in logs if l.log_date == d])
-        daily_counts.append(cnt)
+    start = today - timedelta(days=window - 1)
+    day_rows = session.exec(
+        completed_logs(DailyLog.log_date, func.count(DailyLog.id))
+        .where(DailyLog.log_date >= start, DailyLog.log_date <= today)
+        .group_by(DailyLog.log_date)
+    ).all()
+    per_day = dict(day_rows)
+    dates = [start + timedelta(days=i) for i in range(window)]
+    daily_counts = [per_day.get(d, 0) for d in dates]
     
-    # Simple Heuristic Trend
-    recent = sum(daily_counts[-3:])
-    prev = sum(daily_counts[:3])
+    # Simple Heuristic Trend: most recent part of the window vs the earliest part
+    half = window // 2
+    recent = sum(daily_counts[-half:])
+    prev = sum(daily_counts[:half])
     
     trend_label = "Stable ➡️"
     if recent > prev: trend_label = "Improving 📈"
     elif recent < prev: trend_label = "Declining 📉"
     
+    daily_chart = [{"date": d.strftime("%m-%d"), "completed": c} for d, c in zip(dates, daily_counts)]
     return {
         "weekly_pattern": weekly_chart,
         "category_distribution": category_chart,
         "trend": trend_label,
-        "last_7_days": [{"date": d.strftime("%m-%d"), "completed": c} for d, c in zip(dates, daily_counts)]
+        "window": window,
+        "daily": daily_chart,
+        "last_7_days": daily_chart[-7:]
     }
@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException
-from datetime import date
+from datetime import date, datetime, timedelta
+from typing import List, Optional
 from sqlmodel import Session, select
-from app.core.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from app.core.database import get_async_session, dialect_insert
+from app.core.cache import response_cache
 from app.api.deps import get_current_user
 from app.models.daily_log import DailyLog
 from app.models.task import Task
 from app.models.user import User
-from app.services.streak_service import update_streak
-from app.services.reward_service import issue_reward
+from app.models.reward import Reward
+from app.services.streak_service import update_streak, recompute_streaks
+from app.services.reward_service import issue_reward, STREAK_MILESTONES
+from app.services.stats_service import record_completion, rebuild_user_stats
+from app.services.bitmap_service import apply_completions
 from pydantic import BaseModel
 
 class LogCreate(BaseModel):
@@ -17,41 +24,137 @@ class LogCreate(BaseModel):
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
 @router.post("/")
-def log_task(
+async def log_task(
     log_in: LogCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     # Verify Task Ownership
-    task = session.exec(select(Task).where(Task.id == log_in.task_id, Task.user_id == current_user.id)).first()
+    task = (await session.exec(select(Task).where(Task.id == log_in.task_id, Task.user_id == current_user.id))).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found or access denied")
 
-    task_id = log_in.task_id
-    completed = log_in.completed
-    today = date.today()
-
-    existing_log = session.exec(
-        select(DailyLog).where(
-            DailyLog.task_id == task_id,
-            DailyLog.log_date == today
-        )
-    ).first()
-
-    if existing_log:
+    # A duplicate log for today is caught by the uix_task_day constraint rather than a pre-select.
+    try:
+        result = await session.run_sync(write_log, current_user.id, log_in.task_id, date.today(), log_in.completed)
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
         raise HTTPException(
             status_code=400,
             detail="Task already logged for today"
         )
 
+    response_cache.invalidate(current_user.id)
+    return result
+
+def write_log(session: Session, user_id: int, task_id: int, today: date, completed: bool) -> dict:
+    """
+    Unit of work: log, streak, reward and stats are written by one flush. Caller commits.
+    Returns the response body.
+    """
     log = DailyLog(task_id=task_id, log_date=today, completed=completed)
     session.add(log)
-    session.commit()
-    session.refresh(log)
-
+    with session.no_autoflush:
+        streak = reward = None
+        if completed:
+            record_completion(session, user_id, today)
+            streak = update_streak(session, task_id, today)
+            reward = issue_reward(session, task_id, streak.current_streak)
+            apply_completions(session, [(task_id, today, True)])
+    session.flush()
+    result = {"log": log.dict()}
     if completed:
-        streak = update_streak(session, task_id, today)
-        reward = issue_reward(session, task_id, streak.current_streak)
-        return {"log": log, "streak": streak, "reward": reward}
+        result["streak"] = streak.dict()
+        result["reward"] = reward.dict() if reward else None
+    return result
+
+MAX_LOG_BATCH = 1000
+
+class LogBatchEntry(BaseModel):
+    task_id: int
+    log_date: date
+    completed: bool
+
+class LogBatchItemResult(BaseModel):
+    index: int
+    status: str # "logged", "not_found" or "invalid"
+    detail: Optional[str] = None
+
+@router.post("/batch")
+async def log_tasks_batch(
+    entries: List[LogBatchEntry],
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Syncs many check-ins with explicit dates, e.g. from an offline client.
+    Existing logs for the same (task, day) are overwritten. Streaks are rebuilt once per affected task
+    and rewards are issued for every milestone of the current run not rewarded yet.
+    """
+    if len(entries) > MAX_LOG_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_LOG_BATCH} entries per batch")
+
+    today = date.today()
+    owned = set((await session.exec(
+        select(Task.id).where(Task.id.in_({e.task_id for e in entries}), Task.user_id == current_user.id)
+    )).all())
+
+    items = []
+    rows = {}
+    for i, entry in enumerate(entries):
+        if entry.task_id not in owned:
+            items.append(LogBatchItemResult(index=i, status="not_found", detail="Task not found or access denied"))
+        elif entry.log_date > today:
+            items.append(LogBatchItemResult(index=i, status="invalid", detail="Cannot log a future date"))
+        else:
+            # Later entries for the same task and day win
+            rows[(entry.task_id, entry.log_date)] = entry.dict()
+            items.append(LogBatchItemResult(index=i, status="logged"))
+
+    if not rows:
+        return {"items": items, "streaks": [], "rewards": []}
+
+    # The session doesn't expire on commit, so the returned rows stay readable afterwards
+    streaks, rewards = await session.run_sync(apply_log_batch, current_user.id, list(rows.values()), today)
+    await session.commit()
+    response_cache.invalidate(current_user.id)
+    return {"items": items, "streaks": streaks, "rewards": rewards}
+
+def apply_log_batch(session: Session, user_id: int, rows: List[dict], today: date):
+    """
+    Upserts the validated batch rows and rebuilds everything derived from them. Caller commits.
+    Returns (streaks, rewards).
+    """
+    affected = {row["task_id"] for row in rows}
+    stmt = dialect_insert(DailyLog).values(rows)
+    session.exec(stmt.on_conflict_do_update(
+        index_elements=["task_id", "log_date"],
+        # ON CONFLICT DO UPDATE skips column onupdate defaults, so the change cursor is set here
+        set_={"completed": stmt.excluded.completed, "updated_at": datetime.utcnow()},
+    ))
+
+    apply_completions(session, [(e["task_id"], e["log_date"], e["completed"]) for e in rows])
+    streaks = recompute_streaks(session, affected)
+    # Milestones already rewarded in the current run, so unchecking and re-checking a day can't earn the
+    # same bonus twice. A bonus is dated on the day its run reached the milestone, which keeps bonuses of an
+    # older run (even one synced today) from counting towards a new run.
+    issued = session.exec(
+        select(Reward.task_id, Reward.value, Reward.issued_at)
+        .where(Reward.task_id.in_(affected), Reward.value.in_(STREAK_MILESTONES))
+    ).all()
+    rewards = []
+    for task_id, streak in streaks.items():
+        if not streak.current_streak:
+            continue
+        run_start = streak.last_completed_date - timedelta(days=streak.current_streak - 1)
+        run_start_at = datetime.combine(run_start, datetime.min.time())
+        awarded = {value for reward_task, value, issued_at in issued if reward_task == task_id and issued_at >= run_start_at}
+        for milestone in STREAK_MILESTONES:
+            if milestone <= streak.current_streak and milestone not in awarded:
+                reached = datetime.combine(run_start + timedelta(days=milestone - 1), datetime.min.time())
+                rewards.append(issue_reward(session, task_id, milestone, issued_at=reached))
 
-    return {"log": log}
+    rebuild_user_stats(session, user_id, today)
+    session.flush()
+    return list(streaks.values()), rewards
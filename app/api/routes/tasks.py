@@ -1,14 +1,18 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import date
+from sqlalchemy import and_, update
 from sqlalchemy.exc import IntegrityError
-from app.core.database import get_session
+from app.core.database import get_async_session, dialect_insert
+from app.core.cache import response_cache
 from app.api.deps import get_current_user
 from app.models.task import Task, Category
 from app.models.streak import Streak
 from app.models.daily_log import DailyLog
 from app.models.user import User
+from app.services.stats_service import record_task_change
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
@@ -28,40 +32,37 @@ class TaskUpdate(BaseModel):
     category: Optional[str] = None
     description: Optional[str] = None
     scheduled_time: Optional[str] = None
+    is_active: Optional[bool] = None
 
 @router.get("/", response_model=List[TaskReadWithStatus])
-def get_tasks(
-    session: Session = Depends(get_session),
+async def get_tasks(
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
+    return await response_cache.respond(request, current_user.id, lambda: session.run_sync(tasks_with_status, current_user))
+
+def tasks_with_status(session: Session, current_user: User) -> List[TaskReadWithStatus]:
     today = date.today()
-    tasks = session.exec(
-        select(Task).where(Task.is_active == True, Task.user_id == current_user.id)
+    # One round trip regardless of task count: streak and today's log come from LEFT JOINs
+    rows = session.exec(
+        select(Task, Streak.current_streak, Streak.longest_streak, DailyLog.completed)
+        .outerjoin(Streak, Streak.task_id == Task.id)
+        .outerjoin(DailyLog, and_(DailyLog.task_id == Task.id, DailyLog.log_date == today))
+        .where(Task.is_active == True, Task.user_id == current_user.id)
     ).all()
     
     results = []
-    for task in tasks:
-        # Get Streak info
-        streak = session.exec(select(Streak).where(Streak.task_id == task.id)).first()
-        current_streak = streak.current_streak if streak else 0
-        longest_streak = streak.longest_streak if streak else 0
-        
-        # Get Today's Log
-        log = session.exec(select(DailyLog).where(
-            DailyLog.task_id == task.id, 
-            DailyLog.log_date == today
-        )).first()
-        is_completed_today = log is not None and log.completed
-        
+    for task, current_streak, longest_streak, completed_today in rows:
         results.append(TaskReadWithStatus(
             id=task.id,
             title=task.title,
             description=task.description,
             category=task.category or Category.OTHERS,
             scheduled_time=task.scheduled_time,
-            current_streak=current_streak,
-            longest_streak=longest_streak,
-            is_completed_today=is_completed_today
+            current_streak=current_streak or 0,
+            longest_streak=longest_streak or 0,
+            is_completed_today=bool(completed_today)
         ))
     
     return results
@@ -73,36 +74,38 @@ class TaskCreate(BaseModel):
     scheduled_time: Optional[str] = None
 
 @router.post("/", response_model=Task)
-def create_task(
+async def create_task(
     task_in: TaskCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     try:
         task = Task.from_orm(task_in)
         task.user_id = current_user.id
         session.add(task)
-        session.commit()
-        session.refresh(task)
+        await session.run_sync(record_task_change, current_user.id, total_delta=1, active_delta=1 if task.is_active else 0)
+        await session.commit()
+        response_cache.invalidate(current_user.id)
+        await session.refresh(task)
         return task
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Task with this title already exists")
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         print(f"Error creating task: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error during task creation")
 
 @router.put("/{task_id}", response_model=Task)
-def update_task(
+async def update_task(
     task_id: int, 
     task_update: TaskUpdate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    task = session.exec(
+    task = (await session.exec(
         select(Task).where(Task.id == task_id, Task.user_id == current_user.id)
-    ).first()
+    )).first()
     
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -115,13 +118,144 @@ def update_task(
         task.description = task_update.description
     if task_update.scheduled_time:
         task.scheduled_time = task_update.scheduled_time
+    active_changed = task_update.is_active is not None and task_update.is_active != task.is_active
+    if active_changed:
+        task.is_active = task_update.is_active
     
     try:
         session.add(task)
-        session.commit()
-        session.refresh(task)
+        if active_changed:
+            await session.run_sync(record_task_change, current_user.id, active_delta=1 if task.is_active else -1)
+        await session.commit()
+        response_cache.invalidate(current_user.id)
+        await session.refresh(task)
     except IntegrityError:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=400, detail="Task with this title already exists")
         
     return task
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: str # "created", "updated", "conflict" or "not_found"
+    task_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BulkItemResult]
+
+def _bulk_result(items: List[BulkItemResult]) -> BulkResult:
+    failed = sum(1 for item in items if item.status in ("conflict", "not_found"))
+    return BulkResult(succeeded=len(items) - failed, failed=failed, items=items)
+
+@router.post("/bulk", response_model=BulkResult)
+async def create_tasks_bulk(
+    tasks_in: List[TaskCreate],
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Creates many tasks with one multi-row INSERT ... ON CONFLICT DO NOTHING in a single transaction.
+    Titles that already exist (or repeat within the request) are reported per item instead of failing the batch.
+    """
+    items = []
+    rows = []
+    first_index = {}
+    for i, task_in in enumerate(tasks_in):
+        if task_in.title in first_index:
+            items.append(BulkItemResult(index=i, status="conflict", detail="Duplicate title in request"))
+            continue
+        first_index[task_in.title] = i
+        task = Task.from_orm(task_in)
+        task.user_id = current_user.id
+        rows.append(task.dict(exclude={"id"}))
+        items.append(BulkItemResult(index=i, status="created"))
+
+    if rows:
+        stmt = (
+            dialect_insert(Task)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["title", "user_id"])
+            .returning(Task.id, Task.title)
+        )
+        inserted = {title: task_id for task_id, title in await session.execute(stmt)}
+        for title, i in first_index.items():
+            if title in inserted:
+                items[i].task_id = inserted[title]
+            else:
+                items[i].status = "conflict"
+                items[i].detail = "Task with this title already exists"
+
+        if inserted:
+            await session.run_sync(record_task_change, current_user.id, total_delta=len(inserted), active_delta=len(inserted))
+        await session.commit()
+        response_cache.invalidate(current_user.id)
+
+    return _bulk_result(items)
+
+@router.patch("/bulk", response_model=BulkResult)
+async def update_tasks_bulk(
+    updates: List[TaskBulkUpdate],
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Applies many task updates with one executemany UPDATE in a single transaction.
+    Unknown ids and title collisions are reported per item instead of failing the batch.
+    """
+    # Plain (title, is_active) state so the ORM objects stay clean and only the bulk UPDATE is flushed
+    tasks = {
+        task_id: {"title": title, "is_active": is_active}
+        for task_id, title, is_active in await session.execute(
+            select(Task.id, Task.title, Task.is_active).where(Task.user_id == current_user.id)
+        )
+    }
+    title_owner = {task["title"]: task_id for task_id, task in tasks.items()}
+
+    items = []
+    rows = []
+    active_delta = 0
+    for i, task_update in enumerate(updates):
+        task = tasks.get(task_update.id)
+        if not task:
+            items.append(BulkItemResult(index=i, status="not_found", task_id=task_update.id, detail="Task not found"))
+            continue
+        if task_update.title and title_owner.get(task_update.title, task_update.id) != task_update.id:
+            items.append(BulkItemResult(index=i, status="conflict", task_id=task_update.id, detail="Task with this title already exists"))
+            continue
+
+        # Same rules as update_task: empty values leave the field unchanged
+        changes = {
+            field: value
+            for field, value in task_update.dict(include={"title", "category", "description", "scheduled_time"}).items()
+            if value
+        }
+        if task_update.is_active is not None and task_update.is_active != task["is_active"]:
+            changes["is_active"] = task_update.is_active
+            active_delta += 1 if task_update.is_active else -1
+        if "title" in changes:
+            title_owner.pop(task["title"], None)
+            title_owner[changes["title"]] = task_update.id
+        task.update({k: v for k, v in changes.items() if k in task})
+
+        if changes:
+            rows.append({"id": task_update.id, **changes})
+        items.append(BulkItemResult(index=i, status="updated", task_id=task_update.id))
+
+    if rows:
+        try:
+            await session.execute(update(Task), rows)
+            if active_delta:
+                await session.run_sync(record_task_change, current_user.id, active_delta=active_delta)
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            raise HTTPException(status_code=400, detail="Task with this title already exists")
+        response_cache.invalidate(current_user.id)
+
+    return _bulk_result(items)
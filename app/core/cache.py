@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+class LRUCache:
+    """
+    Thread-safe bounded mapping with LRU eviction, optional TTL and hit/miss counters.
+    """
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+class ResponseCache:
+    """
+    Rendered JSON responses per (user, endpoint, query string, day).
+    Invalidation bumps the user's generation, so stale entries are never matched again and age out via LRU.
+    State is per process: writes only invalidate the worker that handled them, so entries also expire
+    after `ttl` seconds, which bounds how stale other workers can get. A rebuilt but unchanged body keeps
+    its ETag, so clients still get their 304.
+    """
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.entries = LRUCache(maxsize, ttl=ttl)
+        self._generations = {}
+
+    def invalidate(self, user_id: int):
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    async def respond(self, request: Request, user_id: int, build: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Returns the cached body for this request, awaiting `build()` on a miss, with an ETag.
+        Answers 304 without a body when If-None-Match already holds that ETag.
+        """
+        key = (user_id, self._generations.get(user_id, 0), request.url.path, str(request.query_params), date.today())
+        entry = self.entries.get(key)
+        if entry is None:
+            body = JSONResponse(content=jsonable_encoder(await build())).body
+            entry = (f'"{hashlib.sha1(body).hexdigest()}"', body)
+            self.entries.set(key, entry)
+
+        etag, body = entry
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip().replace("W/", "", 1) for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL or None)
@@ -6,3 +6,70 @@ load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./execution.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+# Same database through the async drivers used by the request handlers
+ASYNC_DATABASE_URL = DATABASE_URL
+if DATABASE_URL.startswith("postgresql://"):
+    ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+elif DATABASE_URL.startswith("sqlite://"):
+    ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# Seconds between community leaderboard snapshot refreshes
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv("LEADERBOARD_REFRESH_SECONDS", "300"))
+
+# Max rendered responses kept by the per-user response cache (LRU), and seconds each one is served.
+# Writes only invalidate the worker that handled them, so with several workers or replicas the TTL
+# bounds how long another worker can serve a stale body (0 = no expiry, for a single worker).
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "10"))
+
+# Authenticated-user cache in get_current_user: max entries and seconds before a user is re-read
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+# Password hashing: bcrypt cost for new hashes, hashing processes, and waiting calls allowed before 503s.
+# Tune with `python manage.py bench-login`.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Analytics events are buffered in memory and written in multi-row inserts: a flush happens every
+# ANALYTICS_FLUSH_MS or as soon as ANALYTICS_BATCH_SIZE events are waiting. Beyond
+# ANALYTICS_BUFFER_SIZE pending events new ones are dropped (and counted) rather than slowing requests.
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "500"))
+ANALYTICS_FLUSH_MS = int(os.getenv("ANALYTICS_FLUSH_MS", "1000"))
+ANALYTICS_BUFFER_SIZE = int(os.getenv("ANALYTICS_BUFFER_SIZE", "10000"))
+
+# Raw AnalyticsEvent retention, off by default: raw events are kept forever. To enable it, set
+# ANALYTICS_RETENTION_DAYS (e.g. 90); events older than that are then purged in batches of
+# ANALYTICS_PURGE_BATCH rows, permanently, so they also drop out of the admin export. Their counts live on
+# in the daily rollup. The retention job runs at startup and every ANALYTICS_RETENTION_INTERVAL_SECONDS
+# and, on a partitioned Postgres table, keeps ANALYTICS_PARTITION_MONTHS_AHEAD monthly partitions ready.
+# A one-off purge without enabling the job: `python manage.py purge-analytics --days N`. See also partition-analytics.
+ANALYTICS_RETENTION_DAYS = int(os.getenv("ANALYTICS_RETENTION_DAYS", "0"))
+ANALYTICS_PURGE_BATCH = int(os.getenv("ANALYTICS_PURGE_BATCH", "5000"))
+ANALYTICS_RETENTION_INTERVAL_SECONDS = int(os.getenv("ANALYTICS_RETENTION_INTERVAL_SECONDS", "21600"))
+ANALYTICS_PARTITION_MONTHS_AHEAD = int(os.getenv("ANALYTICS_PARTITION_MONTHS_AHEAD", "2"))
+
+# News feeds: RSS search endpoint (point it at a local stub server for testing), seconds a fetched
+# feed stays fresh, seconds before a failed fetch is retried, and the per-request HTTP timeout.
+NEWS_FEED_BASE_URL = os.getenv("NEWS_FEED_BASE_URL", "https://news.google.com/rss/search")
+NEWS_CACHE_SECONDS = int(os.getenv("NEWS_CACHE_SECONDS", "900"))
+NEWS_RETRY_SECONDS = int(os.getenv("NEWS_RETRY_SECONDS", "60"))
+NEWS_FETCH_TIMEOUT = float(os.getenv("NEWS_FETCH_TIMEOUT", "5"))
+
+# News cache backend: "memory" (each worker fetches on its own) or "db" (one NewsCacheEntry row per topic
+# shared by all workers and replicas; a lease lets exactly one of them refresh a topic per expiry), and how
+# long a lease lasts before a crashed holder's refresh is taken over.
+NEWS_CACHE_BACKEND = os.getenv("NEWS_CACHE_BACKEND", "memory").lower()
+NEWS_REFRESH_LEASE_SECONDS = int(os.getenv("NEWS_REFRESH_LEASE_SECONDS", "30"))
+
+# News relevance filter: "remote" (HuggingFace inference) or "local" (scikit-learn model trained with
+# `manage.py train-relevance`, loaded at startup; falls back to remote while untrained), the remote
+# model id or inference endpoint URL (a local stand-in works for testing), the local model file,
+# memoized verdicts kept in memory, and whether verdicts are also persisted to the database.
+NEWS_RELEVANCE_BACKEND = os.getenv("NEWS_RELEVANCE_BACKEND", "remote").lower()
+NEWS_RELEVANCE_MODEL = os.getenv("NEWS_RELEVANCE_MODEL", "distilbert-base-uncased-finetuned-sst-2-english")
+RELEVANCE_MODEL_PATH = os.getenv("RELEVANCE_MODEL_PATH", "relevance_model.pkl")
+RELEVANCE_CACHE_SIZE = int(os.getenv("RELEVANCE_CACHE_SIZE", "4096"))
+RELEVANCE_PERSIST = os.getenv("RELEVANCE_PERSIST", "0").lower() in ("1", "true", "yes")
@@ -1,5 +1,7 @@
 from sqlmodel import SQLModel, create_engine, Session
-from app.core.config import DATABASE_URL
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.core.config import DATABASE_URL, ASYNC_DATABASE_URL
 
 engine = create_engine(
     DATABASE_URL,
@@ -8,6 +10,59 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
 )
 
+# Async engine for the request handlers (asyncpg / aiosqlite). The sync engine above stays
+# for scripts, background jobs and the ML trainer.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=True,
+    pool_pre_ping=True,
+)
+
+def dialect_insert(model):
+    """
+    INSERT construct for the configured backend, so callers can use on_conflict_do_nothing/do_update.
+    """
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    # Objects stay loaded after commit: lazy refreshes can't happen outside the async context
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+def create_missing_indexes():
+    """
+    create_all() skips tables that already exist, so indexes added to existing models are created here.
+    """
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+def add_updated_at_columns():
+    """
+    create_all() doesn't add columns to existing tables either: adds the updated_at change cursor
+    where it is missing, stamped with the current time. Returns the tables migrated.
+    """
+    from datetime import datetime
+    from sqlalchemy import inspect, text
+
+    inspector = inspect(engine)
+    migrated = []
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            if "updated_at" not in table.c or not inspector.has_table(table.name):
+                continue
+            if "updated_at" in {c["name"] for c in inspector.get_columns(table.name)}:
+                continue
+            column_type = table.c.updated_at.type.compile(engine.dialect)
+            conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN updated_at {column_type}'))
+            conn.execute(table.update().values(updated_at=datetime.utcnow()))
+            migrated.append(table.name)
+    return migrated
@@ -1,7 +1,14 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Optional, Union
-from jose import JWTError, jwt
+from typing import Optional
+from fastapi import HTTPException
+from jose import jwt
 from passlib.context import CryptContext
+from app.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
 
 import os
 
@@ -10,7 +17,7 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-keep-it-secret")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 3000
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,6 +25,88 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+# bcrypt is CPU-bound, so request handlers run it in a dedicated process pool instead of the
+# worker's threadpool. At most PASSWORD_HASH_WORKERS hashes run at once; beyond
+# PASSWORD_HASH_MAX_PENDING waiting calls, requests are turned away with a 503.
+_hash_pool = None
+_hash_slots = None
+_hash_metrics = {"queued": 0, "in_flight": 0, "completed": 0, "rejected": 0, "max_queue_depth": 0, "total_seconds": 0.0, "pool_rebuilds": 0}
+
+def _get_hash_pool():
+    global _hash_pool
+    if _hash_pool is None:
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        _hash_pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _hash_pool
+
+def _replace_broken_hash_pool(broken: ProcessPoolExecutor):
+    # Calls in flight all see the same broken pool; only the first one replaces it
+    global _hash_pool
+    if _hash_pool is broken:
+        _hash_pool = None
+        _hash_metrics["pool_rebuilds"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+async def _run_in_hash_pool(fn, *args):
+    global _hash_slots
+    if _hash_slots is None:
+        _hash_slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+    if _hash_metrics["queued"] >= PASSWORD_HASH_MAX_PENDING:
+        _hash_metrics["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+
+    _hash_metrics["queued"] += 1
+    _hash_metrics["max_queue_depth"] = max(_hash_metrics["max_queue_depth"], _hash_metrics["queued"])
+    try:
+        await _hash_slots.acquire()
+    finally:
+        _hash_metrics["queued"] -= 1
+
+    _hash_metrics["in_flight"] += 1
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    pool = _get_hash_pool()
+    try:
+        try:
+            return await loop.run_in_executor(pool, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM kill, crash in bcrypt), which breaks the whole pool for good: retry once on a new one
+            print("SECURITY WARNING: Password hash pool broke, starting a new one")
+            _replace_broken_hash_pool(pool)
+            return await loop.run_in_executor(_get_hash_pool(), fn, *args)
+    finally:
+        _hash_slots.release()
+        _hash_metrics["in_flight"] -= 1
+        _hash_metrics["completed"] += 1
+        _hash_metrics["total_seconds"] += time.perf_counter() - start
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await _run_in_hash_pool(get_password_hash, password)
+
+def hash_pool_stats() -> dict:
+    completed = _hash_metrics["completed"]
+    return {
+        "workers": PASSWORD_HASH_WORKERS,
+        "max_pending": PASSWORD_HASH_MAX_PENDING,
+        "bcrypt_rounds": BCRYPT_ROUNDS,
+        "queue_depth": _hash_metrics["queued"],
+        "max_queue_depth": _hash_metrics["max_queue_depth"],
+        "in_flight": _hash_metrics["in_flight"],
+        "completed": completed,
+        "rejected": _hash_metrics["rejected"],
+        "pool_rebuilds": _hash_metrics["pool_rebuilds"],
+        "avg_ms": round(_hash_metrics["total_seconds"] / completed * 1000, 1) if completed else 0.0,
+    }
+
+def shutdown_hash_pool():
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -1,7 +1,10 @@
+import asyncio
 from fastapi import FastAPI
 from sqlmodel import SQLModel
-from app.core.database import engine
+from app.core.database import engine, async_engine, create_missing_indexes, add_updated_at_columns
+from app.api.deps import user_cache, invalidate_user
 from app.api.routes import tasks, logs, dashboard, auth, news
+from app.services.analytics_service import track_event
 from fastapi.middleware.cors import CORSMiddleware
 
 # Explicitly import models to ensure they are registered with SQLModel.metadata
@@ -11,6 +14,12 @@ from app.models.streak import Streak
 from app.models.daily_log import DailyLog
 from app.models.reward import Reward
 from app.models.analytics import AnalyticsEvent
+from app.models.user_stats import UserStats
+from app.models.leaderboard import LeaderboardEntry
+from app.models.completion_bitmap import CompletionBitmap
+from app.models.analytics_rollup import AnalyticsHourly, AnalyticsDaily
+from app.models.relevance_label import RelevanceLabel
+from app.models.news_cache import NewsCacheEntry
 
 app = FastAPI(title="Personal Execution Engine")
 
@@ -24,26 +33,15 @@ app.add_middleware(
 
 from fastapi import Request
 from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 @app.middleware("http")
 async def analytics_middleware(request: Request, call_next):
     response = await call_next(request)
     
-    # Simple tracking for App Loads (Frontend)
+    # Simple tracking for App Loads (Frontend), written later in batches by the analytics writer
     if request.url.path in ["/", "/index.html"]:
-        try:
-            # Use a separate try/except for DB interaction so it doesn't affect the user response
-            with Session(engine) as session:
-                from app.models.analytics import AnalyticsEvent
-                event = AnalyticsEvent(
-                    event_type="APP_LOAD",
-                    path=request.url.path
-                )
-                session.add(event)
-                session.commit()
-        except Exception as e:
-            # Just log error, don't crash user experience
-            print(f"ANALYTICS WARNING: Logging failed (DB Issue): {e}")
+        track_event("APP_LOAD", path=request.url.path)
 
     return response
 
@@ -52,35 +50,110 @@ def on_startup():
     try:
         print("Attempting to connect to database...")
         SQLModel.metadata.create_all(engine)
+        add_updated_at_columns()
+        create_missing_indexes()
         print("Database connected and tables created.")
+        backfill_analytics_rollups()
     except Exception as e:
         print(f"CRITICAL: Database connection failed! {e}")
         # We don't raise here so the app can still start and show us logs
         pass
 
+def backfill_analytics_rollups():
+    from app.services.analytics_service import backfill_rollups
+    try:
+        with Session(engine) as session:
+            result = backfill_rollups(session)
+        if result:
+            print(f"Built analytics rollups from existing events: {result}")
+    except Exception as e:
+        # Another worker may be building them at the same time
+        print(f"ANALYTICS WARNING: Rollup backfill failed: {e}")
+
+@app.on_event("startup")
+def load_relevance_model():
+    from app.services.relevance_service import load_relevance_backend
+    backend = load_relevance_backend()
+    print(f"News relevance backend: {backend['name']}")
+
+@app.on_event("startup")
+async def start_background_jobs():
+    from app.services.leaderboard_service import run_leaderboard_refresher
+    from app.services.analytics_service import run_analytics_writer
+    from app.services.retention_service import run_retention_job
+    app.state.leaderboard_refresher = asyncio.create_task(run_leaderboard_refresher())
+    app.state.analytics_writer = asyncio.create_task(run_analytics_writer())
+    app.state.retention_job = asyncio.create_task(run_retention_job())
+
+@app.on_event("shutdown")
+async def stop_background_jobs():
+    from app.core.security import shutdown_hash_pool
+    from app.services.analytics_service import flush_events
+    app.state.leaderboard_refresher.cancel()
+    app.state.retention_job.cancel()
+    app.state.analytics_writer.cancel()
+    try:
+        await app.state.analytics_writer
+    except asyncio.CancelledError:
+        pass
+    # Whatever is still buffered is written before the engine goes away
+    await flush_events()
+    from app.services.news_service import close_news_client
+    await close_news_client()
+    shutdown_hash_pool()
+    await async_engine.dispose()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "message": "Service is running"}
 
+@app.get("/debug/cache_stats")
+def debug_cache_stats():
+    from app.core.cache import response_cache
+    return {
+        "users": user_cache.stats(),
+        "responses": response_cache.entries.stats()
+    }
+
+@app.get("/debug/hash_pool")
+def debug_hash_pool():
+    from app.core.security import hash_pool_stats
+    return hash_pool_stats()
+
+@app.get("/debug/news")
+def debug_news():
+    from app.services.news_service import news_stats
+    return news_stats()
+
+@app.get("/debug/analytics_writer")
+def debug_analytics_writer():
+    from app.services.analytics_service import analytics_writer_stats
+    return analytics_writer_stats()
+
 @app.post("/debug/reset_password")
-def debug_reset_password(username: str, new_pass: str):
+async def debug_reset_password(username: str, new_pass: str):
     try:
-        from app.core.security import get_password_hash
+        from app.core.security import get_password_hash_async
         from app.models.user import User
         from sqlmodel import select
-        
-        with Session(engine) as session:
-            user = session.exec(select(User).where(User.username == username)).first()
-            if not user:
-                # Try case insensitive
-                # Postgres doesnt support ILIKE in sqlmodel easily without col expr
-                # Iterate? No, too slow. Just return failure.
-                return {"status": "error", "message": f"User '{username}' not found"}
-            
-            user.hashed_password = get_password_hash(new_pass)
-            session.add(user)
-            session.commit()
-            return {"status": "success", "message": f"Password updated for {username}"}
+
+        def reset(hashed_password):
+            with Session(engine) as session:
+                user = session.exec(select(User).where(User.username == username)).first()
+                if not user:
+                    # Try case insensitive
+                    # Postgres doesnt support ILIKE in sqlmodel easily without col expr
+                    # Iterate? No, too slow. Just return failure.
+                    return {"status": "error", "message": f"User '{username}' not found"}
+
+                user.hashed_password = hashed_password
+                session.add(user)
+                session.commit()
+                invalidate_user(user.username)
+                return {"status": "success", "message": f"Password updated for {username}"}
+
+        hashed_password = await get_password_hash_async(new_pass)
+        return await run_in_threadpool(reset, hashed_password)
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
@@ -96,6 +169,16 @@ def debug_migrate_time():
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
+@app.get("/debug/migrate_updated_at")
+def debug_migrate_updated_at():
+    try:
+        # Also runs at startup; exposed for databases that were running when the column was introduced
+        migrated = add_updated_at_columns()
+        create_missing_indexes()
+        return {"status": "success", "message": f"Column 'updated_at' added to: {', '.join(migrated) or 'no tables'}"}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
 app.include_router(auth.router)
 app.include_router(dashboard.router)
 app.include_router(tasks.router)
@@ -0,0 +1,70 @@
+import csv
+import os
+from typing import List, Optional, Tuple
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import cross_val_score
+from sklearn.pipeline import Pipeline
+
+from app.core.config import RELEVANCE_MODEL_PATH
+
+TRUE_LABELS = {"1", "true", "yes", "relevant", "positive"}
+
+def news_text(title: str, summary: str) -> str:
+    # Same text the remote classifier sees
+    return f"{title}. {summary}"
+
+def read_training_csv(path: str) -> Tuple[List[str], List[int]]:
+    """
+    Reads labelled headlines from a CSV with `title`, optional `summary` and `relevant` (1/0, true/false) columns.
+    """
+    texts, labels = [], []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if not row.get("title"):
+                continue
+            texts.append(news_text(row["title"], row.get("summary") or ""))
+            labels.append(1 if str(row.get("relevant", "")).strip().lower() in TRUE_LABELS else 0)
+    return texts, labels
+
+def train_relevance_model(csv_path: str, model_path: str = RELEVANCE_MODEL_PATH):
+    """
+    Trains a TF-IDF + logistic regression relevance classifier from labelled headlines and saves it
+    with joblib. Small and fast enough to score a whole feed in well under a millisecond per item.
+    """
+    texts, labels = read_training_csv(csv_path)
+    if len(texts) < 10 or len(set(labels)) < 2:
+        return {"status": "error", "message": "Need at least 10 labelled headlines covering both classes."}
+
+    model = Pipeline(steps=[
+        ('tfidf', TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, min_df=1, strip_accents='unicode')),
+        ('classifier', LogisticRegression(class_weight='balanced', max_iter=1000))
+    ])
+
+    # Held-out accuracy while there is enough data for it, then fit on everything
+    folds = min(5, labels.count(0), labels.count(1))
+    cv_score = cross_val_score(model, texts, labels, cv=folds).mean() if folds >= 2 else None
+    model.fit(texts, labels)
+    joblib.dump(model, model_path)
+
+    return {
+        "status": "success",
+        "samples": len(texts),
+        "relevant": sum(labels),
+        "cv_accuracy": f"{cv_score:.2f}" if cv_score is not None else None,
+        "path": model_path,
+    }
+
+def load_relevance_model(model_path: str = RELEVANCE_MODEL_PATH) -> Optional[Pipeline]:
+    if not os.path.exists(model_path):
+        return None # Model not trained yet
+    return joblib.load(model_path)
+
+def predict_relevance(model: Pipeline, texts: List[str], threshold: float = 0.5) -> List[Tuple[bool, float]]:
+    """
+    (relevant, probability) per text, scored in one vectorized call.
+    """
+    # classes_ are [0, 1]; column 1 is 'relevant'
+    probs = model.predict_proba(texts)[:, 1]
+    return [(bool(p >= threshold), round(float(p), 4)) for p in probs]
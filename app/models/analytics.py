@@ -4,7 +4,8 @@ from typing import Optional
 
 class AnalyticsEvent(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    event_type: str  # "VISIT", "LOGIN", "REGISTER"
+    event_type: str = Field(index=True)  # "VISIT", "LOGIN", "REGISTER"
     user_id: Optional[int] = None # Null for guests
     path: Optional[str] = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}) # Change cursor for delta exports
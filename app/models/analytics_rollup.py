@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class AnalyticsRollupBase(SQLModel):
+    bucket_start: datetime = Field(primary_key=True) # UTC, truncated to the bucket
+    event_type: str = Field(primary_key=True)
+    events: int = 0
+
+class AnalyticsHourly(AnalyticsRollupBase, table=True):
+    """
+    AnalyticsEvent counts per hour and event type, kept up to date by the analytics writer.
+    Rebuild from the raw events with `python manage.py rebuild-analytics-rollups`.
+    """
+
+class AnalyticsDaily(AnalyticsRollupBase, table=True):
+    """
+    AnalyticsEvent counts per UTC day and event type, kept up to date by the analytics writer.
+    """
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import LargeBinary
+
+BITMAP_BYTES = 46 # 366 days, one bit each, rounded up to whole bytes
+
+class CompletionBitmap(SQLModel, table=True):
+    """
+    Compact companion to DailyLog: bit (day_of_year - 1) is set when the task was completed that day.
+    DailyLog stays the source of truth; rebuild with `python manage.py rebuild-bitmaps`.
+    """
+    task_id: int = Field(foreign_key="task.id", primary_key=True)
+    year: int = Field(primary_key=True)
+    bits: bytes = Field(default=bytes(BITMAP_BYTES), sa_type=LargeBinary)
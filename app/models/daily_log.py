@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
 from sqlalchemy import UniqueConstraint
 
@@ -12,3 +12,4 @@ class DailyLog(SQLModel, table=True):
     task_id: int = Field(foreign_key="task.id")
     log_date: date
     completed: bool
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}) # Change cursor for delta exports
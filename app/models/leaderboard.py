@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+
+class LeaderboardEntry(SQLModel, table=True):
+    """
+    Periodically refreshed snapshot of the community leaderboard, one row per user.
+    """
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    username: str
+    tasks_completed: int = 0
+    active_streaks: int = 0
+    rank: int = Field(index=True)
+    refreshed_at: datetime = Field(default_factory=datetime.utcnow)
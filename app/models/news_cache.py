@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Text
+from datetime import datetime
+from typing import Optional
+
+class NewsCacheEntry(SQLModel, table=True):
+    """
+    News feed cache shared by all workers when NEWS_CACHE_BACKEND=db, one row per topic.
+    The worker holding the lease is the only one refreshing the topic; the rest read `items`.
+    """
+    topic: str = Field(primary_key=True)
+    items: str = Field(default="[]", sa_type=Text) # JSON list, as served by /news
+    fetched_at: Optional[datetime] = None
+    attempted_at: Optional[datetime] = None
+    error: Optional[str] = None
+    lease_owner: Optional[str] = None
+    lease_until: Optional[datetime] = None
@@ -0,0 +1,13 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from typing import Optional
+
+class RelevanceLabel(SQLModel, table=True):
+    """
+    Persisted news relevance verdicts, keyed by the sha1 of the item's title and summary.
+    Only written when RELEVANCE_PERSIST is on.
+    """
+    content_hash: str = Field(primary_key=True, max_length=40)
+    relevant: bool
+    score: Optional[float] = None
+    classified_at: datetime = Field(default_factory=datetime.utcnow)
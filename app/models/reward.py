@@ -8,4 +8,4 @@ class Reward(SQLModel, table=True):
     reward_type: str
     value: int
     issued_at: datetime = Field(default_factory=datetime.utcnow)
-
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}) # Change cursor for delta exports
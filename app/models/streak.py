@@ -1,10 +1,11 @@
 from sqlmodel import SQLModel, Field
 from typing import Optional
-from datetime import date
+from datetime import date, datetime
 
 class Streak(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    task_id: int = Field(foreign_key="task.id")
+    task_id: int = Field(foreign_key="task.id", index=True)
     current_streak: int = 0
     longest_streak: int = 0
     last_completed_date: Optional[date] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}) # Change cursor for delta exports
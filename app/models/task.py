@@ -2,7 +2,7 @@ from sqlmodel import SQLModel, Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index
 
 class Category(str, Enum):
     PERSONAL_DEVELOPMENT = "Personal Development"
@@ -14,6 +14,7 @@ class Category(str, Enum):
 class Task(SQLModel, table=True):
     __table_args__ = (
         UniqueConstraint("title", "user_id", name="uix_task_user_title"),
+        Index("ix_task_user_active", "user_id", "is_active"),
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -24,3 +25,4 @@ class Task(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
     scheduled_time: Optional[str] = Field(default=None) # Format "HH:MM" 24h or "HH:MM AM/PM"
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}) # Change cursor for delta exports
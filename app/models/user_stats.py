@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import date
+
+class UserStats(SQLModel, table=True):
+    """
+    Per-user counters kept up to date by the write paths, so dashboards are a primary-key lookup.
+    Rebuild from raw rows with `python manage.py rebuild-stats` if it ever drifts.
+    """
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    total_tasks: int = 0
+    active_tasks: int = 0
+    completed_all_time: int = 0
+    completed_today: int = 0
+    stats_date: Optional[date] = None # Day that completed_today refers to
+    current_streak: int = 0 # Length of the run ending at last_completed_date
+    longest_streak: int = 0
+    last_completed_date: Optional[date] = None
+    total_rewards: int = 0
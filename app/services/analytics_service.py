@@ -0,0 +1,196 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import insert, delete, func
+from app.core.config import ANALYTICS_BATCH_SIZE, ANALYTICS_FLUSH_MS, ANALYTICS_BUFFER_SIZE
+from app.core.database import async_engine, dialect_insert
+from app.models.analytics import AnalyticsEvent
+from app.models.analytics_rollup import AnalyticsHourly, AnalyticsDaily
+from app.utils.date_utils import hour_start, day_start
+
+# Events recorded by requests wait here until the writer task inserts them in batches,
+# so tracking never adds a query or a commit to the request itself.
+_buffer = []
+_wakeup = None
+_metrics = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0, "max_depth": 0, "last_flush_ms": 0.0}
+
+def track_event(event_type: str, user_id: Optional[int] = None, path: Optional[str] = None):
+    """
+    Queues an AnalyticsEvent for the background writer. Never blocks: when the buffer is full the
+    event is dropped and counted. Call from the event loop (async handlers and middleware).
+    """
+    if len(_buffer) >= ANALYTICS_BUFFER_SIZE:
+        _metrics["dropped"] += 1
+        return
+    # Timestamped now, not when the batch is written
+    _buffer.append({"event_type": event_type, "user_id": user_id, "path": path, "timestamp": datetime.utcnow()})
+    _metrics["enqueued"] += 1
+    _metrics["max_depth"] = max(_metrics["max_depth"], len(_buffer))
+    if len(_buffer) >= ANALYTICS_BATCH_SIZE and _wakeup is not None:
+        _wakeup.set()
+
+async def flush_events() -> int:
+    """
+    Writes everything buffered so far, ANALYTICS_BATCH_SIZE rows per INSERT. Returns the rows written.
+    """
+    written = 0
+    while _buffer:
+        batch = _buffer[:ANALYTICS_BATCH_SIZE]
+        start = time.perf_counter()
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(insert(AnalyticsEvent).values(batch))
+                # Rollups move in the same transaction as the raw rows, so they never drift apart
+                for stmt in rollup_upserts(batch):
+                    await conn.execute(stmt)
+        except Exception as e:
+            # Analytics are best effort: a failed batch is counted and discarded
+            del _buffer[:len(batch)]
+            _metrics["failed"] += len(batch)
+            print(f"ANALYTICS WARNING: Dropped {len(batch)} events (DB Issue): {e}")
+            continue
+        # Removed only once written, so a batch interrupted by shutdown is retried by the final flush
+        del _buffer[:len(batch)]
+        written += len(batch)
+        _metrics["written"] += len(batch)
+        _metrics["flushes"] += 1
+        _metrics["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return written
+
+# --- Rollups: per-bucket counts per event type, so admin reports never scan AnalyticsEvent ---
+
+ROLLUPS = {"hour": AnalyticsHourly, "day": AnalyticsDaily}
+BUCKET_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+def truncate(ts: datetime, bucket: str) -> datetime:
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if bucket == "day" else ts
+
+def rollup_upserts(batch: List[dict]):
+    """
+    One multi-row upsert per rollup table that adds the batch's counts to the existing buckets.
+    """
+    for bucket, model in ROLLUPS.items():
+        counts = Counter((truncate(e["timestamp"], bucket), e["event_type"]) for e in batch)
+        stmt = dialect_insert(model).values([
+            {"bucket_start": start, "event_type": event_type, "events": n}
+            for (start, event_type), n in counts.items()
+        ])
+        yield stmt.on_conflict_do_update(
+            index_elements=["bucket_start", "event_type"],
+            set_={"events": model.events + stmt.excluded.events},
+        )
+
+def rebuild_rollups(session: Session, since: Optional[datetime] = None) -> dict:
+    """
+    Recomputes the rollup buckets from `since` (default: the day of the oldest raw event) onwards
+    from AnalyticsEvent with INSERT ... SELECT ... GROUP BY. Older buckets are kept: their raw events
+    may already have been purged. Run offline (or when the writer is idle): events written meanwhile
+    can be counted twice.
+    """
+    if since is None:
+        oldest = session.exec(select(func.min(AnalyticsEvent.timestamp))).one()
+        if oldest is None:
+            return {"hours": 0, "days": 0}
+        since = oldest
+    since = truncate(since, "day")
+
+    hour = hour_start(AnalyticsEvent.timestamp)
+    session.exec(delete(AnalyticsHourly).where(AnalyticsHourly.bucket_start >= since))
+    session.exec(delete(AnalyticsDaily).where(AnalyticsDaily.bucket_start >= since))
+    session.exec(insert(AnalyticsHourly).from_select(
+        ["bucket_start", "event_type", "events"],
+        select(hour, AnalyticsEvent.event_type, func.count())
+        .where(AnalyticsEvent.timestamp >= since)
+        .group_by(hour, AnalyticsEvent.event_type),
+    ))
+    # Days are summed from the hours just built instead of rescanning the events
+    day = day_start(AnalyticsHourly.bucket_start)
+    session.exec(insert(AnalyticsDaily).from_select(
+        ["bucket_start", "event_type", "events"],
+        select(day, AnalyticsHourly.event_type, func.sum(AnalyticsHourly.events))
+        .where(AnalyticsHourly.bucket_start >= since)
+        .group_by(day, AnalyticsHourly.event_type),
+    ))
+    session.commit()
+    return {
+        "hours": session.exec(select(func.count()).select_from(AnalyticsHourly).where(AnalyticsHourly.bucket_start >= since)).one(),
+        "days": session.exec(select(func.count()).select_from(AnalyticsDaily).where(AnalyticsDaily.bucket_start >= since)).one(),
+    }
+
+def backfill_rollups(session: Session) -> Optional[dict]:
+    """
+    Builds the rollups from the existing raw events when both rollup tables are still empty, i.e. on
+    the first start after they were introduced, so older events don't vanish from the admin reports.
+    Returns the rebuild result, or None when there was nothing to do.
+    """
+    for model in ROLLUPS.values():
+        if session.exec(select(model.bucket_start).limit(1)).first() is not None:
+            return None
+    if session.exec(select(AnalyticsEvent.id).limit(1)).first() is None:
+        return None
+    return rebuild_rollups(session)
+
+def event_totals(session: Session) -> dict:
+    """
+    All-time count per event type, summed from the daily rollup.
+    """
+    rows = session.exec(
+        select(AnalyticsDaily.event_type, func.sum(AnalyticsDaily.events)).group_by(AnalyticsDaily.event_type)
+    ).all()
+    return {event_type: int(total) for event_type, total in rows}
+
+def event_timeseries(session: Session, bucket: str, start: datetime, end: datetime) -> dict:
+    """
+    Dense per-bucket counts for each event type over [start, end), read from the rollup for `bucket`.
+    """
+    model = ROLLUPS[bucket]
+    step = BUCKET_STEPS[bucket]
+    start = truncate(start, bucket)
+    rows = session.exec(
+        select(model.bucket_start, model.event_type, model.events)
+        .where(model.bucket_start >= start, model.bucket_start < end)
+    ).all()
+
+    counts = {}
+    for bucket_start, event_type, events in rows:
+        counts.setdefault(event_type, {})[bucket_start] = events
+    starts = []
+    current = start
+    while current < end:
+        starts.append(current)
+        current += step
+
+    return {
+        "bucket": bucket,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "starts": [s.isoformat() for s in starts],
+        "series": {event_type: [per_bucket.get(s, 0) for s in starts] for event_type, per_bucket in sorted(counts.items())},
+    }
+
+async def run_analytics_writer():
+    """
+    Background loop started with the app: flushes every ANALYTICS_FLUSH_MS, or early once a full batch is waiting.
+    """
+    global _wakeup
+    _wakeup = asyncio.Event()
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=ANALYTICS_FLUSH_MS / 1000)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        await flush_events()
+
+def analytics_writer_stats() -> dict:
+    return {
+        "batch_size": ANALYTICS_BATCH_SIZE,
+        "flush_ms": ANALYTICS_FLUSH_MS,
+        "buffer_size": ANALYTICS_BUFFER_SIZE,
+        "pending": len(_buffer),
+        **_metrics,
+    }
@@ -0,0 +1,101 @@
+import calendar
+from datetime import date
+from typing import Iterable, List, Tuple
+import numpy as np
+from sqlmodel import Session, select
+from sqlalchemy import tuple_, delete, insert
+from app.models.completion_bitmap import CompletionBitmap, BITMAP_BYTES
+from app.services.streak_service import iter_completed_log_pages
+
+# Bitmaps are updated as Python ints (bit i = day i of the year), and read back in bulk by
+# day_counts, which unpacks many of them at once with numpy for the heatmap.
+
+def to_int(bits: bytes) -> int:
+    return int.from_bytes(bits, "little")
+
+def to_bytes(value: int) -> bytes:
+    return value.to_bytes(BITMAP_BYTES, "little")
+
+def day_index(day: date) -> int:
+    return day.timetuple().tm_yday - 1
+
+def apply_completions(session: Session, entries: Iterable[Tuple[int, date, bool]]):
+    """
+    Sets or clears the bit of every (task_id, day, completed) entry. One select for all touched
+    (task, year) rows; the rows are written with the caller's commit.
+    """
+    changes = {}
+    for task_id, day, completed in entries:
+        changes.setdefault((task_id, day.year), []).append((day_index(day), completed))
+    if not changes:
+        return
+
+    query = select(CompletionBitmap).where(tuple_(CompletionBitmap.task_id, CompletionBitmap.year).in_(list(changes)))
+    if session.get_bind().dialect.name == "postgresql":
+        # Serialize concurrent writers of the same task-year
+        query = query.with_for_update()
+    rows = {(row.task_id, row.year): row for row in session.exec(query)}
+
+    for key, bit_changes in changes.items():
+        row = rows.get(key)
+        if not row:
+            row = CompletionBitmap(task_id=key[0], year=key[1])
+        bits = to_int(row.bits)
+        for idx, completed in bit_changes:
+            if completed:
+                bits |= 1 << idx
+            else:
+                bits &= ~(1 << idx)
+        row.bits = to_bytes(bits)
+        session.add(row)
+
+def rebuild_all_bitmaps(session: Session, batch_size: int = 5000) -> dict:
+    """
+    Recomputes every bitmap from DailyLog in one ordered pass, writing whole task-years at a time.
+    Memory holds at most `batch_size` log rows and pending bitmaps.
+    """
+    rows_seen = 0
+    written = 0
+    # Replaced in one transaction, so readers never see a half-built table
+    session.exec(delete(CompletionBitmap))
+    current_key = None
+    bits = 0
+    pending = []
+
+    def flush():
+        nonlocal pending, written
+        if pending:
+            session.execute(insert(CompletionBitmap), pending)
+            written += len(pending)
+            pending = []
+
+    for rows in iter_completed_log_pages(session, batch_size):
+        for task_id, log_date in rows:
+            key = (task_id, log_date.year)
+            if key != current_key:
+                if current_key:
+                    pending.append({"task_id": current_key[0], "year": current_key[1], "bits": to_bytes(bits)})
+                current_key, bits = key, 0
+            bits |= 1 << day_index(log_date)
+        rows_seen += len(rows)
+        if len(pending) >= batch_size:
+            flush()
+
+    if current_key:
+        pending.append({"task_id": current_key[0], "year": current_key[1], "bits": to_bytes(bits)})
+    flush()
+    session.commit()
+    return {"rows": rows_seen, "bitmaps": written}
+
+def days_in_year(year: int) -> int:
+    return 366 if calendar.isleap(year) else 365
+
+def day_counts(bitmaps: List[bytes], year: int) -> List[int]:
+    """
+    Dense per-day completion counts for `year`, summed over the given bitmaps.
+    """
+    if not bitmaps:
+        return [0] * days_in_year(year)
+    packed = np.frombuffer(b"".join(bitmaps), dtype=np.uint8).reshape(len(bitmaps), BITMAP_BYTES)
+    bits = np.unpackbits(packed, axis=1, bitorder="little")[:, :days_in_year(year)]
+    return bits.sum(axis=0).tolist()
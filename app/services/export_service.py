@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Optional
+from sqlmodel import Session, select
+from app.core.database import engine
+from app.models.user import User
+from app.models.task import Task
+from app.models.daily_log import DailyLog
+from app.models.streak import Streak
+from app.models.reward import Reward
+from app.models.analytics import AnalyticsEvent
+
+# Export name -> model. The first four are what the admin export has always contained.
+EXPORT_TABLES = {
+    "users": User,
+    "tasks": Task,
+    "logs": DailyLog,
+    "analytics": AnalyticsEvent,
+    "streaks": Streak,
+    "rewards": Reward,
+}
+DEFAULT_EXPORT_TABLES = ["users", "tasks", "logs", "analytics"]
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+EXCLUDED_COLUMNS = {"hashed_password"}
+
+# Delta exports: a cursor is a UTC timestamp, and each export returns the rows whose updated_at falls in
+# [since, cursor). The new cursor trails the clock by EXPORT_CURSOR_GRACE_SECONDS so that rows stamped
+# by transactions still in flight are picked up by the next sync instead of being skipped.
+EXPORT_CURSOR_GRACE_SECONDS = 60
+
+EXPORT_YIELD_PER = 1000 # rows fetched per round trip from the server-side cursor
+EXPORT_CHUNK_BYTES = 64 * 1024 # response body is sent in chunks of about this size
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+def _columns(name: str):
+    return [c for c in EXPORT_TABLES[name].__table__.columns if c.name not in EXCLUDED_COLUMNS]
+
+def new_cursor() -> datetime:
+    return datetime.utcnow() - timedelta(seconds=EXPORT_CURSOR_GRACE_SECONDS)
+
+def format_cursor(cursor: datetime) -> str:
+    return cursor.isoformat(timespec="microseconds")
+
+def parse_cursor(value: str) -> datetime:
+    """
+    Raises ValueError for anything that isn't a cursor handed out by format_cursor.
+    """
+    return datetime.fromisoformat(value)
+
+def iter_rows(session: Session, name: str, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Iterator[dict]:
+    """
+    Streams a table's rows as plain dicts through a server-side cursor, EXPORT_YIELD_PER at a time,
+    so memory stays flat whatever the table size. With `since`, only rows changed in [since, until)
+    are read, through the updated_at index.
+    """
+    columns = _columns(name)
+    query = select(*columns).order_by(columns[0])
+    if since is not None:
+        updated_at = EXPORT_TABLES[name].updated_at
+        query = select(*columns).where(updated_at >= since, updated_at < until).order_by(updated_at, columns[0])
+    result = session.execute(query.execution_options(yield_per=EXPORT_YIELD_PER))
+    for row in result.mappings():
+        yield dict(row)
+
+def _iter_text(session: Session, tables: List[str], fmt: str, since: Optional[datetime], cursor: datetime) -> Iterator[str]:
+    if fmt == "csv":
+        # One table per CSV, checked by the route
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([c.name for c in _columns(tables[0])])
+        for row in iter_rows(session, tables[0], since, cursor):
+            writer.writerow([_json_default(v) if isinstance(v, (date, datetime)) else v for v in row.values()])
+            if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    if fmt == "json":
+        yield "{" + json.dumps("cursor") + ":" + json.dumps(format_cursor(cursor))
+    for i, name in enumerate(tables):
+        if fmt == "json":
+            yield ("," if i == 0 else "],") + json.dumps(name) + ":["
+        first = True
+        for row in iter_rows(session, name, since, cursor):
+            if fmt == "ndjson":
+                # Each line says which table it came from, so several tables can share one stream
+                yield json.dumps({"_table": name, **row}, default=_json_default) + "\n"
+            else:
+                yield ("" if first else ",") + json.dumps(row, default=_json_default)
+            first = False
+    if fmt == "json":
+        yield "]}" if tables else "}"
+
+def iter_export(tables: List[str], fmt: str, cursor: datetime, since: Optional[datetime] = None, gzip: bool = False) -> Iterator[bytes]:
+    """
+    Body generator for the admin export StreamingResponse. Owns its session, which lives exactly
+    as long as the stream, and yields ~EXPORT_CHUNK_BYTES chunks, gzip-compressed on the fly if asked.
+    Full export without `since`, otherwise only the rows changed in [since, cursor).
+    """
+    compressor = zlib.compressobj(wbits=31) if gzip else None # 31: gzip container
+    pending = []
+    size = 0
+    with Session(engine) as session:
+        for piece in _iter_text(session, tables, fmt, since, cursor):
+            pending.append(piece)
+            size += len(piece)
+            if size < EXPORT_CHUNK_BYTES:
+                continue
+            chunk = "".join(pending).encode()
+            pending, size = [], 0
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+
+    chunk = "".join(pending).encode()
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
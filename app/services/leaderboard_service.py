@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlmodel import Session, select
+from sqlalchemy import func, delete, insert, literal, text
+from starlette.concurrency import run_in_threadpool
+from app.core.config import LEADERBOARD_REFRESH_SECONDS
+from app.core.database import engine
+from app.models.leaderboard import LeaderboardEntry
+from app.models.streak import Streak
+from app.models.task import Task
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.services.stats_service import backfill_user_stats
+
+# Every worker runs a refresher; on Postgres this advisory lock lets only one of them rebuild at a time
+LEADERBOARD_LOCK_KEY = 7213401
+
+def _claim_refresh(session: Session, wait: bool) -> bool:
+    """
+    Takes the refresh lock for the current transaction (released by its commit). Without `wait`,
+    returns False right away when another worker holds it. SQLite serializes writers by itself.
+    """
+    if engine.dialect.name != "postgresql":
+        return True
+    if wait:
+        session.exec(text("SELECT pg_advisory_xact_lock(:key)").bindparams(key=LEADERBOARD_LOCK_KEY))
+        return True
+    return session.exec(text("SELECT pg_try_advisory_xact_lock(:key)").bindparams(key=LEADERBOARD_LOCK_KEY)).one()[0]
+
+def refresh_leaderboard(session: Session, force: bool = False, wait: bool = False) -> Optional[int]:
+    """
+    Rebuilds the snapshot in one transaction from UserStats and per-user streak counts.
+    Reads one row per user and per streak, never the DailyLog history; users without a
+    UserStats row yet get theirs built first.
+    Skipped (returns None) while another worker is refreshing, or, unless `force`, when another
+    worker already refreshed within the last half interval, so there is one rebuild per interval.
+    `wait` waits for a running refresh instead of skipping it.
+    """
+    if not _claim_refresh(session, wait):
+        session.rollback()
+        return None
+    if not force:
+        last = session.exec(select(func.max(LeaderboardEntry.refreshed_at))).one()
+        if last and datetime.utcnow() - last < timedelta(seconds=LEADERBOARD_REFRESH_SECONDS / 2):
+            session.rollback()
+            return None
+
+    backfill_user_stats(session)
+    streak_counts = (
+        select(Task.user_id, func.count(Streak.id).label("active_streaks"))
+        .join(Task, Task.id == Streak.task_id)
+        .where(Streak.current_streak > 0)
+        .group_by(Task.user_id)
+        .subquery()
+    )
+    tasks_completed = func.coalesce(UserStats.completed_all_time, 0)
+    ranked = (
+        select(
+            User.id,
+            User.username,
+            tasks_completed,
+            func.coalesce(streak_counts.c.active_streaks, 0),
+            func.row_number().over(order_by=(tasks_completed.desc(), User.id)),
+            literal(datetime.utcnow()),
+        )
+        .outerjoin(UserStats, UserStats.user_id == User.id)
+        .outerjoin(streak_counts, streak_counts.c.user_id == User.id)
+    )
+
+    session.exec(delete(LeaderboardEntry))
+    session.exec(
+        insert(LeaderboardEntry).from_select(
+            ["user_id", "username", "tasks_completed", "active_streaks", "rank", "refreshed_at"],
+            ranked,
+        )
+    )
+    session.commit()
+    return session.exec(select(func.count(LeaderboardEntry.user_id))).one()
+
+def _page(session: Session, limit: int, offset: int):
+    # Ranks are dense 1..N, so a page is an index range scan on rank
+    return session.exec(
+        select(LeaderboardEntry)
+        .where(LeaderboardEntry.rank > offset, LeaderboardEntry.rank <= offset + limit)
+        .order_by(LeaderboardEntry.rank)
+    ).all()
+
+def get_leaderboard_page(session: Session, limit: int, offset: int):
+    entries = _page(session, limit, offset)
+    if not entries and offset == 0:
+        # First request before the refresher ran: build the snapshot, or wait for the worker building it
+        refresh_leaderboard(session, wait=True)
+        entries = _page(session, limit, offset)
+    return entries
+
+def _refresh():
+    with Session(engine) as session:
+        refresh_leaderboard(session)
+
+async def run_leaderboard_refresher():
+    """
+    Background loop started with the app that keeps the snapshot at most LEADERBOARD_REFRESH_SECONDS old.
+    """
+    while True:
+        try:
+            await run_in_threadpool(_refresh)
+        except Exception as e:
+            print(f"LEADERBOARD WARNING: Refresh failed: {e}")
+        await asyncio.sleep(LEADERBOARD_REFRESH_SECONDS)
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import httpx
+from bs4 import BeautifulSoup
+from sqlalchemy import or_, select, update
+from starlette.concurrency import run_in_threadpool
+from app.core.config import (
+    NEWS_FEED_BASE_URL, NEWS_CACHE_SECONDS, NEWS_RETRY_SECONDS, NEWS_FETCH_TIMEOUT,
+    NEWS_CACHE_BACKEND, NEWS_REFRESH_LEASE_SECONDS,
+)
+from app.core.database import async_engine, dialect_insert
+from app.models.news_cache import NewsCacheEntry
+from app.services.relevance_service import filter_relevant, relevance_stats
+
+# Topic -> RSS search query, and whether items go through the AI relevance filter
+# (finance skips it: market news is often negative but important)
+NEWS_FEEDS = {
+    "finance": {"query": "finance+investing+stock+market", "ai_filter": False},
+    "growth": {"query": "personal+development+productivity+mindset+life+hacks", "ai_filter": True},
+}
+
+# In-memory cache to avoid rate limiting. Requests are always answered from here; expired topics
+# are refreshed by a background task (stale-while-revalidate). With NEWS_CACHE_BACKEND=db this is the
+# worker's copy of the shared NewsCacheEntry rows.
+NEWS_CACHE = {
+    topic: {"data": [], "timestamp": 0, "attempted": 0, "fetch_ms": None, "error": None, "refreshes": 0, "failures": 0, "adopted": 0}
+    for topic in NEWS_FEEDS
+}
+
+def parse_feed(content: bytes, use_ai_filter: bool = False) -> List[Dict]:
+    root = ET.fromstring(content)
+    candidates = []
+
+    # Fetch Top 15, then Filter down to 5-10
+    for item in root.findall(".//item")[:15]:
+        title = item.find("title").text if item.find("title") is not None else "No Title"
+        link = item.find("link").text if item.find("link") is not None else "#"
+        pub_date = item.find("pubDate").text if item.find("pubDate") is not None else ""
+
+        # Clean description
+        raw_desc = item.find("description").text if item.find("description") is not None else ""
+        summary = ""
+        if raw_desc:
+            soup = BeautifulSoup(raw_desc, "html.parser")
+            summary = soup.get_text()
+
+        candidates.append({
+            "title": title,
+            "link": link,
+            "summary": summary,
+            "date": pub_date
+        })
+
+    # AI FILTERING: all candidates in one batch, previously seen items from the memo
+    if use_ai_filter:
+        candidates = [item for item, keep in zip(candidates, filter_relevant(candidates)) if keep]
+
+    return candidates[:8] # Cap at 8 items
+
+# One pooled client per process, so refreshes reuse connections (and TLS sessions) to the feed host
+_client: Optional[httpx.AsyncClient] = None
+_refresh_task: Optional[asyncio.Task] = None
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=NEWS_FETCH_TIMEOUT,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=len(NEWS_FEEDS)),
+            follow_redirects=True,
+        )
+    return _client
+
+async def fetch_feed(topic: str) -> List[Dict]:
+    feed = NEWS_FEEDS[topic]
+    url = f"{NEWS_FEED_BASE_URL}?q={feed['query']}&hl=en-US&gl=US&ceid=US:en"
+    response = await _get_client().get(url)
+    response.raise_for_status()
+    # Parsing and the (blocking) AI filter stay off the event loop
+    return await run_in_threadpool(parse_feed, response.content, feed["ai_filter"])
+
+async def _refresh_topic(topic: str):
+    entry = NEWS_CACHE[topic]
+    start = time.perf_counter()
+    entry["attempted"] = time.time()
+    try:
+        entry["data"] = await fetch_feed(topic)
+        entry["timestamp"] = time.time()
+        entry["error"] = None
+        entry["refreshes"] += 1
+    except Exception as e:
+        # Keep serving the previous items; retried after NEWS_RETRY_SECONDS
+        entry["error"] = str(e) or type(e).__name__
+        entry["failures"] += 1
+        print(f"Error fetching news for {topic}: {entry['error']}")
+    finally:
+        entry["fetch_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+# --- Shared cache (NEWS_CACHE_BACKEND=db) ---
+# Workers first look at the shared row; only one per expiry wins the lease, fetches and classifies, and
+# publishes the result, while the others keep serving their copy and pick the new one up on their next
+# check (at most NEWS_RETRY_SECONDS later).
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+def _epoch(value: Optional[datetime]) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp() if value else 0
+
+async def _load_shared(topic: str):
+    async with async_engine.connect() as conn:
+        result = await conn.execute(select(NewsCacheEntry).where(NewsCacheEntry.topic == topic))
+        return result.mappings().first()
+
+def _adopt(entry: dict, row) -> bool:
+    # Takes the shared copy if it is newer than ours
+    if row is None or _epoch(row["fetched_at"]) <= entry["timestamp"]:
+        return False
+    entry["data"] = json.loads(row["items"])
+    entry["timestamp"] = _epoch(row["fetched_at"])
+    entry["error"] = row["error"]
+    entry["adopted"] += 1
+    return True
+
+async def _acquire_lease(topic: str) -> bool:
+    """
+    Atomically claims the topic's refresh: succeeds only if the shared copy has expired, no attempt
+    was made within NEWS_RETRY_SECONDS and no other worker holds a live lease.
+    """
+    now = datetime.utcnow()
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            dialect_insert(NewsCacheEntry).values(topic=topic, items="[]").on_conflict_do_nothing(index_elements=["topic"])
+        )
+        result = await conn.execute(
+            update(NewsCacheEntry)
+            .where(
+                NewsCacheEntry.topic == topic,
+                or_(NewsCacheEntry.fetched_at.is_(None), NewsCacheEntry.fetched_at < now - timedelta(seconds=NEWS_CACHE_SECONDS)),
+                or_(NewsCacheEntry.attempted_at.is_(None), NewsCacheEntry.attempted_at < now - timedelta(seconds=NEWS_RETRY_SECONDS)),
+                or_(NewsCacheEntry.lease_until.is_(None), NewsCacheEntry.lease_until < now),
+            )
+            .values(lease_owner=WORKER_ID, lease_until=now + timedelta(seconds=NEWS_REFRESH_LEASE_SECONDS), attempted_at=now)
+        )
+        return result.rowcount == 1
+
+async def _publish(topic: str, entry: dict):
+    # Releases the lease; new items only on success, so a failed refresh leaves the shared copy in place
+    values = {"lease_owner": None, "lease_until": None, "error": entry["error"]}
+    if entry["error"] is None:
+        values.update(items=json.dumps(entry["data"]), fetched_at=datetime.utcfromtimestamp(entry["timestamp"]))
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            update(NewsCacheEntry)
+            .where(NewsCacheEntry.topic == topic, NewsCacheEntry.lease_owner == WORKER_ID)
+            .values(**values)
+        )
+
+async def _refresh_shared(topic: str):
+    entry = NEWS_CACHE[topic]
+    entry["attempted"] = time.time()
+    try:
+        _adopt(entry, await _load_shared(topic))
+        if time.time() - entry["timestamp"] <= NEWS_CACHE_SECONDS:
+            return # Another worker already refreshed it
+        leased = await _acquire_lease(topic)
+    except Exception as e:
+        # News must not depend on the database being up
+        print(f"Shared news cache unavailable, refreshing {topic} locally: {e}")
+        await _refresh_topic(topic)
+        return
+
+    if leased:
+        await _refresh_topic(topic)
+        try:
+            await _publish(topic, entry)
+        except Exception as e:
+            print(f"Could not publish news for {topic}: {e}")
+        return
+
+    # Someone else is refreshing. A cold worker waits for their result rather than serving nothing.
+    deadline = time.monotonic() + 2 * NEWS_FETCH_TIMEOUT
+    while entry["timestamp"] == 0 and time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        try:
+            _adopt(entry, await _load_shared(topic))
+        except Exception as e:
+            print(f"Shared news cache unavailable: {e}")
+            break
+
+def _due_topics(now: float) -> List[str]:
+    return [
+        topic for topic, entry in NEWS_CACHE.items()
+        if now - entry["timestamp"] > NEWS_CACHE_SECONDS and now - entry["attempted"] > NEWS_RETRY_SECONDS
+    ]
+
+async def refresh_news(topics: Optional[List[str]] = None):
+    """
+    Fetches the given (default: all) topic feeds concurrently.
+    """
+    refresh = _refresh_shared if NEWS_CACHE_BACKEND == "db" else _refresh_topic
+    await asyncio.gather(*(refresh(topic) for topic in topics or list(NEWS_FEEDS)))
+
+def schedule_refresh() -> Optional[asyncio.Task]:
+    """
+    Starts a background refresh of the expired topics unless one is already running. Returns the running task, if any.
+    """
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        due = _due_topics(time.time())
+        if not due:
+            return None
+        _refresh_task = asyncio.create_task(refresh_news(due))
+    return _refresh_task
+
+async def get_news() -> Dict[str, List[Dict]]:
+    task = schedule_refresh()
+    # Only a cold cache (nothing fetched yet) makes the caller wait for the refresh
+    if task and all(entry["timestamp"] == 0 for entry in NEWS_CACHE.values()):
+        await asyncio.shield(task)
+    return {topic: entry["data"] for topic, entry in NEWS_CACHE.items()}
+
+def news_stats() -> dict:
+    now = time.time()
+    return {
+        "feed_base_url": NEWS_FEED_BASE_URL,
+        "cache_seconds": NEWS_CACHE_SECONDS,
+        "cache_backend": NEWS_CACHE_BACKEND,
+        "worker": WORKER_ID,
+        "refreshing": _refresh_task is not None and not _refresh_task.done(),
+        "topics": {
+            topic: {
+                "items": len(entry["data"]),
+                "age_seconds": round(now - entry["timestamp"], 1) if entry["timestamp"] else None,
+                "last_fetch_ms": entry["fetch_ms"],
+                "last_error": entry["error"],
+                "refreshes": entry["refreshes"],
+                "failures": entry["failures"],
+                "adopted": entry["adopted"], # times a newer copy fetched by another worker was taken
+            }
+            for topic, entry in NEWS_CACHE.items()
+        },
+        "relevance": relevance_stats(),
+    }
+
+async def close_news_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
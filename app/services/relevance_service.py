@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from huggingface_hub import InferenceClient
+from sqlmodel import Session, select
+from app.core.cache import LRUCache
+from app.core.config import (
+    NEWS_RELEVANCE_BACKEND, NEWS_RELEVANCE_MODEL, RELEVANCE_MODEL_PATH,
+    RELEVANCE_CACHE_SIZE, RELEVANCE_PERSIST, NEWS_FETCH_TIMEOUT,
+)
+from app.core.database import engine, dialect_insert
+from app.models.relevance_label import RelevanceLabel
+
+HF_TOKEN = os.getenv("HF_TOKEN") # Add this to Railway variables
+# Initialize client (uses public API if no token, subject to lower limits). Bounded like the feed
+# fetches, so a slow endpoint costs one timeout per refresh rather than stalling it.
+hf_client = InferenceClient(token=HF_TOKEN, timeout=NEWS_FETCH_TIMEOUT)
+
+RELEVANCE_THRESHOLD = 0.7
+
+# content hash -> verdict. Headlines repeat across refreshes, so most items are answered from here.
+relevance_cache = LRUCache(RELEVANCE_CACHE_SIZE)
+_metrics = {"items": 0, "memory_hits": 0, "db_hits": 0, "classified": 0, "batches": 0, "errors": 0, "total_ms": 0.0, "last_ms": None}
+
+def content_hash(title: str, summary: str) -> str:
+    # Keyed by the active backend too, so verdicts from another model (or an older local model) aren't reused
+    return hashlib.sha1(f"{_backend['id']}\n{title}\n{summary}".encode()).hexdigest()
+
+def hf_classify(texts: List[str]) -> List[Tuple[bool, Optional[float]]]:
+    """
+    Classifies all texts with one inference request. Uses a small, fast sentiment model as a proxy for
+    'educating/inspiring' vs 'generic/noise': confidently POSITIVE items are kept.
+    """
+    response = hf_client.post(json={"inputs": texts}, model=NEWS_RELEVANCE_MODEL, task="text-classification")
+    # One list of {'label', 'score'} per input
+    verdicts = []
+    for labels in json.loads(response):
+        top = max(labels, key=lambda label: label["score"])
+        verdicts.append((top["label"] == "POSITIVE" and top["score"] > RELEVANCE_THRESHOLD, top["score"]))
+    return verdicts
+
+# Batch classifier in use; anything taking a list of texts and returning (relevant, score) per text
+# can stand in for it, e.g. in tests.
+classify_texts = hf_classify
+_backend = {"name": "remote", "id": f"remote:{NEWS_RELEVANCE_MODEL}"}
+
+def load_relevance_backend(name: str = NEWS_RELEVANCE_BACKEND) -> dict:
+    """
+    Selects the classifier, once at startup. "local" loads the scikit-learn model from
+    RELEVANCE_MODEL_PATH and scores in-process with no network; without a trained model it
+    stays on the remote one.
+    """
+    global classify_texts
+    if name == "local":
+        from app.ml.relevance_model import load_relevance_model, predict_relevance
+        try:
+            model = load_relevance_model(RELEVANCE_MODEL_PATH)
+        except Exception as e:
+            print(f"AI Filter Warning: Could not load {RELEVANCE_MODEL_PATH}: {e}")
+            model = None
+        if model is not None:
+            classify_texts = lambda texts: predict_relevance(model, texts)
+            # The file's mtime tells a retrained model apart
+            _backend.update(name="local", id=f"local:{RELEVANCE_MODEL_PATH}:{int(os.path.getmtime(RELEVANCE_MODEL_PATH))}")
+            return _backend
+        print(f"AI Filter Warning: No relevance model at {RELEVANCE_MODEL_PATH} (run manage.py train-relevance), using remote inference")
+    classify_texts = hf_classify
+    _backend.update(name="remote", id=f"remote:{NEWS_RELEVANCE_MODEL}")
+    return _backend
+
+def _load_persisted(keys: List[str]) -> Dict[str, bool]:
+    with Session(engine) as session:
+        rows = session.exec(select(RelevanceLabel).where(RelevanceLabel.content_hash.in_(keys))).all()
+        return {row.content_hash: row.relevant for row in rows}
+
+def _persist(rows: List[dict]):
+    with Session(engine) as session:
+        session.exec(dialect_insert(RelevanceLabel).values(rows).on_conflict_do_nothing(index_elements=["content_hash"]))
+        session.commit()
+
+def filter_relevant(items: List[Dict]) -> List[bool]:
+    """
+    Relevance verdict per news item (dicts with title and summary). Items seen before are answered
+    from the memo (and the database when RELEVANCE_PERSIST is on); the rest go to the classifier in a
+    single batch. If classification fails the items are kept, as before, and not memoized.
+    """
+    keys = [content_hash(item["title"], item["summary"]) for item in items]
+    texts = {key: f"{item['title']}. {item['summary']}" for key, item in zip(keys, items)}
+    _metrics["items"] += len(texts)
+
+    verdicts = {}
+    for key in texts:
+        cached = relevance_cache.get(key)
+        if cached is not None:
+            verdicts[key] = cached
+    _metrics["memory_hits"] += len(verdicts)
+
+    missing = [key for key in texts if key not in verdicts]
+    if missing and RELEVANCE_PERSIST:
+        try:
+            persisted = _load_persisted(missing)
+        except Exception as e:
+            print(f"AI Filter Warning: Could not read stored verdicts: {e}")
+            persisted = {}
+        for key, relevant in persisted.items():
+            relevance_cache.set(key, relevant)
+        verdicts.update(persisted)
+        _metrics["db_hits"] += len(persisted)
+        missing = [key for key in missing if key not in verdicts]
+
+    if missing:
+        start = time.perf_counter()
+        try:
+            results = classify_texts([texts[key] for key in missing])
+        except Exception as e:
+            print(f"AI Filter Error: {e}")
+            _metrics["errors"] += 1
+            results = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        _metrics["batches"] += 1
+        _metrics["total_ms"] += elapsed_ms
+        _metrics["last_ms"] = round(elapsed_ms, 1)
+
+        if results is not None:
+            _metrics["classified"] += len(missing)
+            for key, (relevant, _) in zip(missing, results):
+                verdicts[key] = relevant
+                relevance_cache.set(key, relevant)
+            if RELEVANCE_PERSIST:
+                try:
+                    _persist([
+                        {"content_hash": key, "relevant": relevant, "score": score}
+                        for key, (relevant, score) in zip(missing, results)
+                    ])
+                except Exception as e:
+                    print(f"AI Filter Warning: Could not store verdicts: {e}")
+
+    return [verdicts.get(key, True) for key in keys] # Fallback: keep it
+
+def relevance_stats() -> dict:
+    items = _metrics["items"]
+    batches = _metrics["batches"]
+    return {
+        "backend": _backend["name"],
+        "model": RELEVANCE_MODEL_PATH if _backend["name"] == "local" else NEWS_RELEVANCE_MODEL,
+        "persist": RELEVANCE_PERSIST,
+        "cache": relevance_cache.stats(),
+        "hit_rate": round((_metrics["memory_hits"] + _metrics["db_hits"]) / items, 3) if items else None,
+        "avg_batch_ms": round(_metrics["total_ms"] / batches, 1) if batches else None,
+        **{k: v for k, v in _metrics.items() if k != "total_ms"},
+    }
@@ -0,0 +1,206 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlmodel import Session, select
+from sqlalchemy import case, delete, func, text
+from starlette.concurrency import run_in_threadpool
+from app.core.config import (
+    ANALYTICS_RETENTION_DAYS, ANALYTICS_PURGE_BATCH,
+    ANALYTICS_RETENTION_INTERVAL_SECONDS, ANALYTICS_PARTITION_MONTHS_AHEAD,
+)
+from app.core.database import engine, dialect_insert
+from app.models.analytics import AnalyticsEvent
+from app.models.analytics_rollup import AnalyticsHourly, AnalyticsDaily
+from app.utils.date_utils import day_start
+
+# Raw events only back the recent hourly view; once older than the retention window they are
+# compacted into the daily rollup and represented by it alone.
+
+def retention_cutoff(days: int = ANALYTICS_RETENTION_DAYS, now: Optional[datetime] = None) -> datetime:
+    # Whole UTC days, so a purged day is never half counted by a later rollup rebuild
+    now = now or datetime.utcnow()
+    return datetime.combine(now.date(), datetime.min.time()) - timedelta(days=days)
+
+def purge_events(session: Session, cutoff: datetime, batch_size: int = ANALYTICS_PURGE_BATCH) -> int:
+    """
+    Deletes raw events older than `cutoff`, oldest first, committing every `batch_size` rows so
+    no single transaction holds long locks or bloats the WAL. Returns the rows deleted.
+    """
+    deleted = 0
+    while True:
+        ids = session.exec(
+            select(AnalyticsEvent.id)
+            .where(AnalyticsEvent.timestamp < cutoff)
+            .order_by(AnalyticsEvent.timestamp)
+            .limit(batch_size)
+        ).all()
+        if not ids:
+            break
+        # The timestamp bound lets Postgres prune to the expired partitions
+        session.exec(delete(AnalyticsEvent).where(AnalyticsEvent.id.in_(ids), AnalyticsEvent.timestamp < cutoff))
+        session.commit()
+        deleted += len(ids)
+    return deleted
+
+def compact_events(session: Session, cutoff: datetime):
+    """
+    Folds the raw events older than `cutoff` into the daily rollup, per day and event type.
+    The larger of the rollup and the raw count wins: days before the rollups existed take the raw
+    count, while a day a previous purge left half deleted keeps its complete rollup count.
+    """
+    day = day_start(AnalyticsEvent.timestamp)
+    stmt = dialect_insert(AnalyticsDaily).from_select(
+        ["bucket_start", "event_type", "events"],
+        select(day, AnalyticsEvent.event_type, func.count())
+        .where(AnalyticsEvent.timestamp < cutoff)
+        .group_by(day, AnalyticsEvent.event_type),
+    )
+    session.exec(stmt.on_conflict_do_update(
+        index_elements=["bucket_start", "event_type"],
+        set_={"events": case(
+            (stmt.excluded.events > AnalyticsDaily.events, stmt.excluded.events),
+            else_=AnalyticsDaily.events,
+        )},
+    ))
+    session.commit()
+
+def prune_hourly(session: Session, cutoff: datetime) -> int:
+    """
+    Drops hourly buckets older than `cutoff`; the daily rollup keeps those days. Returns the rows deleted.
+    """
+    result = session.exec(delete(AnalyticsHourly).where(AnalyticsHourly.bucket_start < cutoff))
+    session.commit()
+    return result.rowcount
+
+# --- Postgres monthly range partitioning of AnalyticsEvent ---
+# Partitioned tables get whole expired months dropped instantly instead of deleted row by row,
+# which keeps vacuum work and backups proportional to the retention window.
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+def _partition_name(month: date) -> str:
+    return f"analyticsevent_y{month.year}m{month.month:02d}"
+
+def is_partitioned(session: Session) -> bool:
+    if engine.dialect.name != "postgresql":
+        return False
+    relkind = session.exec(text("SELECT relkind FROM pg_class WHERE relname = 'analyticsevent'")).first()
+    return relkind is not None and relkind[0] == "p"
+
+def list_partitions(session: Session) -> List[str]:
+    rows = session.exec(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'analyticsevent' ORDER BY c.relname"
+    )).all()
+    return [row[0] for row in rows]
+
+def ensure_partitions(session: Session, first: date, months_ahead: int = ANALYTICS_PARTITION_MONTHS_AHEAD) -> List[str]:
+    """
+    Creates the monthly partitions from `first` through `months_ahead` months past the current one. Caller commits.
+    """
+    created = []
+    existing = set(list_partitions(session))
+    month = _month_start(first)
+    last = _month_start(date.today())
+    for _ in range(months_ahead):
+        last = _next_month(last)
+    while month <= last:
+        name = _partition_name(month)
+        if name not in existing:
+            session.exec(text(
+                f"CREATE TABLE {name} PARTITION OF analyticsevent "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            ))
+            created.append(name)
+        month = _next_month(month)
+    return created
+
+def drop_expired_partitions(session: Session, cutoff: datetime) -> List[str]:
+    """
+    Drops partitions whose whole month is older than `cutoff`. Caller commits.
+    """
+    dropped = []
+    for name in list_partitions(session):
+        try:
+            month = date(int(name[-7:-3]), int(name[-2:]), 1)
+        except ValueError:
+            continue # Not one of ours
+        if datetime.combine(_next_month(month), datetime.min.time()) <= cutoff:
+            session.exec(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    return dropped
+
+def partition_events_table(session: Session, months_ahead: int = ANALYTICS_PARTITION_MONTHS_AHEAD) -> dict:
+    """
+    One-off conversion of analyticsevent into a table range-partitioned by month on timestamp.
+    Runs in a single transaction: the rows are copied into the new monthly partitions and the
+    old table is dropped. Stop the app (or accept that writes block) while it runs.
+    """
+    if engine.dialect.name != "postgresql":
+        return {"status": "error", "message": "Partitioning is only supported on Postgres"}
+    if is_partitioned(session):
+        return {"status": "ok", "message": "Already partitioned", "partitions": list_partitions(session)}
+
+    oldest = session.exec(select(func.min(AnalyticsEvent.timestamp))).one()
+    session.exec(text("ALTER TABLE analyticsevent RENAME TO analyticsevent_legacy"))
+    session.exec(text(
+        "CREATE TABLE analyticsevent (LIKE analyticsevent_legacy INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (\"timestamp\")"
+    ))
+    # The id sequence must outlive the old table
+    session.exec(text("ALTER SEQUENCE analyticsevent_id_seq OWNED BY analyticsevent.id"))
+    created = ensure_partitions(session, (oldest or datetime.utcnow()).date(), months_ahead)
+    session.exec(text("INSERT INTO analyticsevent SELECT * FROM analyticsevent_legacy"))
+    session.exec(text("DROP TABLE analyticsevent_legacy"))
+    # Unique constraints on a partitioned table must include the partition key
+    session.exec(text("ALTER TABLE analyticsevent ADD PRIMARY KEY (id, \"timestamp\")"))
+    for index in AnalyticsEvent.__table__.indexes:
+        index.create(session.connection())
+    session.commit()
+    return {"status": "ok", "partitions": created}
+
+def run_retention(session: Session, days: int = ANALYTICS_RETENTION_DAYS, batch_size: int = ANALYTICS_PURGE_BATCH) -> dict:
+    """
+    One retention pass: prepares upcoming partitions, then drops/deletes raw events and hourly
+    buckets older than the retention window.
+    """
+    result = {"cutoff": None, "partitions_created": [], "partitions_dropped": [], "events_deleted": 0, "hourly_deleted": 0}
+    partitioned = is_partitioned(session)
+    if partitioned:
+        result["partitions_created"] = ensure_partitions(session, date.today())
+        session.commit()
+    if days <= 0:
+        return result
+
+    cutoff = retention_cutoff(days)
+    result["cutoff"] = cutoff.isoformat()
+    compact_events(session, cutoff)
+    if partitioned:
+        result["partitions_dropped"] = drop_expired_partitions(session, cutoff)
+        session.commit()
+    # The partially expired month (or the whole table when unpartitioned) is trimmed row by row
+    result["events_deleted"] = purge_events(session, cutoff, batch_size)
+    result["hourly_deleted"] = prune_hourly(session, cutoff)
+    return result
+
+def _retain():
+    with Session(engine) as session:
+        result = run_retention(session)
+    if result["events_deleted"] or result["partitions_dropped"] or result["partitions_created"]:
+        print(f"ANALYTICS RETENTION: {result}")
+
+async def run_retention_job():
+    """
+    Background loop started with the app that applies the retention policy every ANALYTICS_RETENTION_INTERVAL_SECONDS.
+    """
+    while True:
+        try:
+            await run_in_threadpool(_retain)
+        except Exception as e:
+            print(f"ANALYTICS WARNING: Retention pass failed: {e}")
+        await asyncio.sleep(ANALYTICS_RETENTION_INTERVAL_SECONDS)
@@ -1,15 +1,27 @@
+from datetime import datetime
+from typing import Optional
 from sqlmodel import Session
 from app.models.reward import Reward
+from app.models.task import Task
+from app.services.stats_service import record_reward
 
-def issue_reward(session: Session, task_id: int, streak_count: int):
-    if streak_count in (3, 7, 30):
+STREAK_MILESTONES = (3, 7, 30)
+
+def issue_reward(session: Session, task_id: int, streak_count: int, issued_at: Optional[datetime] = None):
+    """
+    Adds a streak bonus when the streak hits a milestone. Caller commits.
+    `issued_at` dates a bonus earned on an earlier day (back-dated check-ins); default now.
+    """
+    if streak_count in STREAK_MILESTONES:
         reward = Reward(
             task_id=task_id,
             reward_type="streak_bonus",
             value=streak_count,
+            issued_at=issued_at or datetime.utcnow(),
         )
         session.add(reward)
-        session.commit()
+        task = session.get(Task, task_id)
+        record_reward(session, task.user_id)
         return reward
 
     return None
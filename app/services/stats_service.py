@@ -0,0 +1,203 @@
+from sqlmodel import Session, select
+from sqlalchemy import case, func, true, update
+from datetime import date, timedelta
+from typing import Optional
+from app.models.task import Task
+from app.models.daily_log import DailyLog
+from app.models.reward import Reward
+from app.models.user import User
+from app.models.user_stats import UserStats
+from app.core.database import dialect_insert
+from app.utils.date_utils import is_consecutive_day
+from app.services.streak_service import summarize_runs
+
+def get_user_counts(session: Session, user_id: int, today: date) -> dict:
+    """
+    Returns the dashboard counters for a user in a single round trip.
+    Each table is aggregated once with COUNT(...) FILTER (WHERE ...), so no rows are materialized.
+    """
+    task_counts = select(
+        func.count(Task.id).label("total"),
+        func.count(Task.id).filter(Task.is_active == True).label("active"),
+    ).where(Task.user_id == user_id).subquery()
+
+    log_counts = select(
+        func.count(DailyLog.id).filter(DailyLog.log_date == today).label("completed_today"),
+        func.count(DailyLog.id).label("completed_all_time"),
+    ).join(Task).where(Task.user_id == user_id, DailyLog.completed == True).subquery()
+
+    reward_counts = select(
+        func.count(Reward.id).label("total_rewards"),
+    ).join(Task).where(Task.user_id == user_id).subquery()
+
+    row = session.exec(
+        select(task_counts, log_counts, reward_counts).select_from(
+            task_counts.join(log_counts, true()).join(reward_counts, true())
+        )
+    ).one()
+    return dict(row._mapping)
+
+def compute_global_streak(session: Session, user_id: int):
+    """
+    Computes the user-level streak in the database with gaps-and-islands, returning two values at most.
+    Returns (length of the most recent run, longest run, last completion date).
+    """
+    dates = (
+        select(DailyLog.log_date)
+        .join(Task)
+        .where(Task.user_id == user_id, DailyLog.completed == True)
+        .distinct()
+        .subquery()
+    )
+    row = session.exec(summarize_runs(dates)).first()
+    if not row:
+        return 0, 0, None
+    return row.current_streak, row.longest_streak, row.last_completed_date
+
+def compute_user_stats(session: Session, user_id: int, today: date) -> dict:
+    """
+    A user's UserStats column values, computed from Task/DailyLog/Reward.
+    """
+    counts = get_user_counts(session, user_id, today)
+    current_run, longest, last_date = compute_global_streak(session, user_id)
+    return {
+        "user_id": user_id,
+        "total_tasks": counts["total"],
+        "active_tasks": counts["active"],
+        "completed_all_time": counts["completed_all_time"],
+        "completed_today": counts["completed_today"],
+        "stats_date": today,
+        "current_streak": current_run,
+        "longest_streak": longest,
+        "last_completed_date": last_date,
+        "total_rewards": counts["total_rewards"],
+    }
+
+def rebuild_user_stats(session: Session, user_id: int, today: Optional[date] = None) -> UserStats:
+    """
+    Recomputes a user's UserStats row from Task/DailyLog/Reward. Caller commits.
+    """
+    today = today or date.today()
+    values = compute_user_stats(session, user_id, today)
+    # Upsert, so two requests building the same missing row don't collide on the primary key
+    stmt = dialect_insert(UserStats).values(**values)
+    session.exec(stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={k: stmt.excluded[k] for k in values if k != "user_id"},
+    ))
+    return session.get(UserStats, user_id, populate_existing=True)
+
+def rebuild_all_user_stats(session: Session, batch_size: int = 100) -> int:
+    user_ids = session.exec(select(User.id).order_by(User.id)).all()
+    for i, user_id in enumerate(user_ids, start=1):
+        rebuild_user_stats(session, user_id)
+        if i % batch_size == 0:
+            session.commit()
+    session.commit()
+    return len(user_ids)
+
+def backfill_user_stats(session: Session) -> int:
+    """
+    Builds the missing UserStats rows of users that predate the table or haven't written anything yet.
+    Returns the rows built. Caller commits.
+    """
+    user_ids = session.exec(
+        select(User.id).outerjoin(UserStats, UserStats.user_id == User.id).where(UserStats.user_id == None)
+    ).all()
+    for user_id in user_ids:
+        rebuild_user_stats(session, user_id)
+    return len(user_ids)
+
+def _load_stats(session: Session, user_id: int, today: date) -> Optional[UserStats]:
+    stats = session.get(UserStats, user_id)
+    if stats and stats.stats_date != today:
+        # First touch of a new day: yesterday's count no longer applies
+        stats.completed_today = 0
+        stats.stats_date = today
+    return stats
+
+def get_user_stats(session: Session, user_id: int, today: Optional[date] = None) -> UserStats:
+    """
+    Primary-key lookup of the user's stats, built on first use for users that predate the table.
+    """
+    today = today or date.today()
+    stats = _load_stats(session, user_id, today)
+    if not stats:
+        stats = rebuild_user_stats(session, user_id, today)
+        session.commit()
+        session.refresh(stats)
+    return stats
+
+def effective_current_streak(stats: UserStats, today: date) -> int:
+    # The run only counts while its last day is today or yesterday
+    if stats.last_completed_date and stats.last_completed_date >= today - timedelta(days=1):
+        return stats.current_streak
+    return 0
+
+# --- Incremental maintenance, called by the write paths before they commit ---
+# Counters move by SQL-side deltas (col = col + n), so concurrent writes for the same user add up instead
+# of overwriting each other. A missing row is built from scratch after flushing, so it already includes
+# the pending write.
+
+def _update_stats(session: Session, user_id: int, today: date, values: dict) -> bool:
+    """
+    Applies `values` to the user's row. Returns False when the row had to be created instead (nothing
+    left to apply). The UPDATE also holds the row lock until commit.
+    """
+    stmt = update(UserStats).where(UserStats.user_id == user_id).values(**values)
+    if session.exec(stmt).rowcount:
+        return True
+    session.flush()
+    inserted = session.exec(
+        dialect_insert(UserStats).values(**compute_user_stats(session, user_id, today))
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    ).rowcount
+    if inserted:
+        return False
+    # A concurrent request created the row first, without this write
+    session.exec(stmt)
+    return True
+
+def record_task_change(session: Session, user_id: int, total_delta: int = 0, active_delta: int = 0):
+    _update_stats(session, user_id, date.today(), {
+        "total_tasks": UserStats.total_tasks + total_delta,
+        "active_tasks": UserStats.active_tasks + active_delta,
+    })
+
+def record_completion(session: Session, user_id: int, log_date: date):
+    today = date.today()
+    applied = _update_stats(session, user_id, today, {
+        "completed_all_time": UserStats.completed_all_time + 1,
+        # The first completion of a new day starts completed_today over
+        "completed_today": case((UserStats.stats_date == today, UserStats.completed_today), else_=0) + (1 if log_date == today else 0),
+        "stats_date": today,
+    })
+    if not applied:
+        return
+
+    # Safe to read-modify-write: the counter UPDATE above locked the row
+    last, current, longest = session.exec(
+        select(UserStats.last_completed_date, UserStats.current_streak, UserStats.longest_streak)
+        .where(UserStats.user_id == user_id)
+    ).one()
+    if last == log_date:
+        # Another task on a day that already counts towards the streak
+        return
+    elif last and log_date < last:
+        # Back-dated completion can join runs anywhere in history
+        session.flush()
+        current, longest, last = compute_global_streak(session, user_id)
+    else:
+        if last and is_consecutive_day(last, log_date):
+            current += 1
+        else:
+            current = 1
+        longest = max(longest, current)
+        last = log_date
+    session.exec(
+        update(UserStats).where(UserStats.user_id == user_id)
+        .values(current_streak=current, longest_streak=longest, last_completed_date=last)
+    )
+
+def record_reward(session: Session, user_id: int):
+    _update_stats(session, user_id, date.today(), {"total_rewards": UserStats.total_rewards + 1})
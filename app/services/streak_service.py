@@ -1,9 +1,15 @@
+import time
 from sqlmodel import Session, select
+from sqlalchemy import func, update, insert, bindparam, tuple_, exists
 from datetime import date
 from app.models.streak import Streak
-from app.utils.date_utils import is_consecutive_day
+from app.models.daily_log import DailyLog
+from app.utils.date_utils import is_consecutive_day, day_number
 
 def update_streak(session: Session, task_id: int, today: date):
+    """
+    Advances the task's streak for a completion on `today`. Caller commits.
+    """
     streak = session.exec(
         select(Streak).where(Streak.task_id == task_id)
     ).first()
@@ -20,5 +26,171 @@ def update_streak(session: Session, task_id: int, today: date):
         streak.longest_streak = max(streak.longest_streak, streak.current_streak)
         streak.last_completed_date = today
 
-    session.commit()
+    session.add(streak)
     return streak
+
+def recompute_streaks(session: Session, task_ids) -> dict:
+    """
+    Rebuilds the Streak rows of the given tasks from their DailyLog history in one query.
+    Used after out-of-order or back-dated writes, where incremental update_streak does not apply.
+    Returns {task_id: Streak}. Caller commits.
+    """
+    task_ids = list(task_ids)
+    dates = (
+        select(DailyLog.task_id, DailyLog.log_date)
+        .where(DailyLog.task_id.in_(task_ids), DailyLog.completed == True)
+        .distinct()
+        .subquery()
+    )
+    runs = {row.task_id: row for row in session.exec(summarize_runs(dates, ["task_id"]))}
+    streaks = {s.task_id: s for s in session.exec(select(Streak).where(Streak.task_id.in_(task_ids)))}
+
+    for task_id in task_ids:
+        streak = streaks.get(task_id)
+        if not streak:
+            streak = streaks[task_id] = Streak(task_id=task_id)
+        run = runs.get(task_id)
+        streak.current_streak = run.current_streak if run else 0
+        streak.longest_streak = run.longest_streak if run else 0
+        streak.last_completed_date = run.last_completed_date if run else None
+        session.add(streak)
+    return streaks
+
+def summarize_runs(dates, keys=()):
+    """
+    Gaps-and-islands over `dates`, a subquery of distinct completion dates (column `log_date`) per key.
+    Consecutive days share the same day_number(log_date) - row_number(), so each group is one unbroken run.
+    Returns a select with one row per key: (*keys, current_streak, longest_streak, last_completed_date),
+    where current_streak is the length of the most recent run.
+    """
+    key_cols = [dates.c[k] for k in keys]
+    numbered = select(
+        *key_cols,
+        dates.c.log_date,
+        (day_number(dates.c.log_date) - func.row_number().over(
+            partition_by=key_cols or None, order_by=dates.c.log_date
+        )).label("grp"),
+    ).subquery()
+
+    run_keys = [numbered.c[k] for k in keys]
+    runs = select(
+        *run_keys,
+        func.max(numbered.c.log_date).label("end_date"),
+        func.count().label("length"),
+    ).group_by(*run_keys, numbered.c.grp).subquery()
+
+    ranked_keys = [runs.c[k] for k in keys]
+    ranked = select(
+        *ranked_keys,
+        runs.c.length,
+        runs.c.end_date,
+        func.max(runs.c.length).over(partition_by=ranked_keys or None).label("longest"),
+        func.row_number().over(partition_by=ranked_keys or None, order_by=runs.c.end_date.desc()).label("recency"),
+    ).subquery()
+
+    return select(
+        *[ranked.c[k] for k in keys],
+        ranked.c.length.label("current_streak"),
+        ranked.c.longest.label("longest_streak"),
+        ranked.c.end_date.label("last_completed_date"),
+    ).where(ranked.c.recency == 1)
+
+def _apply_streaks(session: Session, results):
+    """
+    Writes rebuilt (task_id, current, longest, last_date) tuples with one executemany UPDATE and one INSERT.
+    """
+    task_ids = [r[0] for r in results]
+    existing = set(session.exec(select(Streak.task_id).where(Streak.task_id.in_(task_ids))).all())
+    table = Streak.__table__
+
+    updates = [
+        {"b_task_id": t, "b_current": c, "b_longest": l, "b_last": d}
+        for t, c, l, d in results if t in existing
+    ]
+    inserts = [
+        {"task_id": t, "current_streak": c, "longest_streak": l, "last_completed_date": d}
+        for t, c, l, d in results if t not in existing
+    ]
+    conn = session.connection()
+    if updates:
+        conn.execute(
+            update(table)
+            .where(table.c.task_id == bindparam("b_task_id"))
+            .values(current_streak=bindparam("b_current"), longest_streak=bindparam("b_longest"), last_completed_date=bindparam("b_last")),
+            updates,
+        )
+    if inserts:
+        conn.execute(insert(table), inserts)
+    session.commit()
+
+def iter_completed_log_pages(session: Session, page_size: int):
+    """
+    Yields pages of (task_id, log_date) for completed logs in (task_id, log_date) order.
+    Keyset pagination walks the uix_task_day index without holding a cursor open between pages.
+    """
+    cursor = None
+    while True:
+        page = select(DailyLog.task_id, DailyLog.log_date).where(DailyLog.completed == True)
+        if cursor:
+            page = page.where(tuple_(DailyLog.task_id, DailyLog.log_date) > tuple_(*cursor))
+        rows = session.exec(page.order_by(DailyLog.task_id, DailyLog.log_date).limit(page_size)).all()
+        if not rows:
+            return
+        yield rows
+        cursor = rows[-1]
+
+def rebuild_all_streaks(session: Session, batch_size: int = 5000, progress=None) -> dict:
+    """
+    Recomputes every task's Streak from DailyLog in a single ordered pass over (task_id, log_date).
+    Results are written every `batch_size` tasks, so memory stays bounded however many log rows there are.
+    `progress(rows, elapsed_seconds)` is called after every page.
+    """
+    start = time.monotonic()
+    rows_seen = 0
+    tasks_written = 0
+    pending = []
+    task_id = run = longest = last_date = None
+
+    for rows in iter_completed_log_pages(session, batch_size):
+        for row_task_id, log_date in rows:
+            if row_task_id != task_id:
+                if task_id is not None:
+                    pending.append((task_id, run, longest, last_date))
+                task_id, run, longest, last_date = row_task_id, 0, 0, None
+            if last_date and is_consecutive_day(last_date, log_date):
+                run += 1
+            else:
+                run = 1
+            longest = max(longest, run)
+            last_date = log_date
+
+        rows_seen += len(rows)
+        if len(pending) >= batch_size:
+            _apply_streaks(session, pending)
+            tasks_written += len(pending)
+            pending = []
+        if progress:
+            progress(rows_seen, time.monotonic() - start)
+
+    if task_id is not None:
+        pending.append((task_id, run, longest, last_date))
+    if pending:
+        _apply_streaks(session, pending)
+        tasks_written += len(pending)
+
+    # Streaks of tasks that no longer have any completed log
+    session.exec(
+        update(Streak)
+        .where(~exists().where(DailyLog.task_id == Streak.task_id, DailyLog.completed == True))
+        .values(current_streak=0, longest_streak=0, last_completed_date=None)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+
+    elapsed = time.monotonic() - start
+    return {
+        "rows": rows_seen,
+        "tasks": tasks_written,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": int(rows_seen / elapsed) if elapsed else rows_seen,
+    }
@@ -1,4 +1,54 @@
 from datetime import date, timedelta
+from sqlalchemy import DateTime, Integer
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 def is_consecutive_day(last_date: date, current_date: date) -> bool:
     return last_date + timedelta(days=1) == current_date
+
+class day_number(FunctionElement):
+    """
+    SQL expression for a date as whole days since 1970-01-01, so consecutive dates differ by exactly 1.
+    """
+    type = Integer()
+    inherit_cache = True
+
+@compiles(day_number)
+def _day_number_default(element, compiler, **kw):
+    # Postgres: date - date is an integer number of days
+    return "(%s - DATE '1970-01-01')" % compiler.process(element.clauses, **kw)
+
+@compiles(day_number, "sqlite")
+def _day_number_sqlite(element, compiler, **kw):
+    return "CAST(julianday(%s) - 2440587.5 AS INTEGER)" % compiler.process(element.clauses, **kw)
+
+class hour_start(FunctionElement):
+    """
+    SQL expression truncating a timestamp to the start of its hour.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+class day_start(FunctionElement):
+    """
+    SQL expression truncating a timestamp to midnight of its day.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(hour_start)
+def _hour_start_default(element, compiler, **kw):
+    return "date_trunc('hour', %s)" % compiler.process(element.clauses, **kw)
+
+@compiles(hour_start, "sqlite")
+def _hour_start_sqlite(element, compiler, **kw):
+    # Same text layout SQLAlchemy uses for DateTime on SQLite, so values compare and match as keys
+    return "strftime('%%Y-%%m-%%d %%H:00:00.000000', %s)" % compiler.process(element.clauses, **kw)
+
+@compiles(day_start)
+def _day_start_default(element, compiler, **kw):
+    return "date_trunc('day', %s)" % compiler.process(element.clauses, **kw)
+
+@compiles(day_start, "sqlite")
+def _day_start_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%m-%%d 00:00:00.000000', %s)" % compiler.process(element.clauses, **kw)
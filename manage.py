@@ -0,0 +1,171 @@
+import argparse
+import sys
+import time
+from sqlmodel import SQLModel, Session
+
+from app.core.database import engine
+from app.core.config import ANALYTICS_RETENTION_DAYS, ANALYTICS_PURGE_BATCH, ANALYTICS_PARTITION_MONTHS_AHEAD, RELEVANCE_MODEL_PATH
+
+# Explicitly import models to ensure they are registered with SQLModel.metadata
+from app.models.user import User
+from app.models.task import Task
+from app.models.streak import Streak
+from app.models.daily_log import DailyLog
+from app.models.reward import Reward
+from app.models.analytics import AnalyticsEvent
+from app.models.user_stats import UserStats
+from app.models.leaderboard import LeaderboardEntry
+from app.models.completion_bitmap import CompletionBitmap
+from app.models.analytics_rollup import AnalyticsHourly, AnalyticsDaily
+from app.models.relevance_label import RelevanceLabel
+from app.models.news_cache import NewsCacheEntry
+
+def rebuild_stats(args):
+    from app.services.stats_service import rebuild_user_stats, rebuild_all_user_stats
+
+    start = time.time()
+    with Session(engine) as session:
+        if args.user:
+            rebuild_user_stats(session, args.user)
+            session.commit()
+            count = 1
+        else:
+            count = rebuild_all_user_stats(session)
+    print(f"Rebuilt stats for {count} user(s) in {time.time() - start:.2f}s")
+
+def refresh_leaderboard(args):
+    from app.services.leaderboard_service import refresh_leaderboard as refresh
+
+    start = time.time()
+    with Session(engine) as session:
+        count = refresh(session, force=True)
+    print(f"Ranked {count} user(s) in {time.time() - start:.2f}s")
+
+def rebuild_streaks(args):
+    from app.services.streak_service import rebuild_all_streaks
+
+    def progress(rows, elapsed):
+        print(f"  {rows} rows, {int(rows / elapsed) if elapsed else rows} rows/sec", flush=True)
+
+    with Session(engine) as session:
+        result = rebuild_all_streaks(session, batch_size=args.batch_size, progress=progress)
+    print(f"Rebuilt streaks for {result['tasks']} task(s) from {result['rows']} log rows "
+          f"in {result['seconds']}s ({result['rows_per_sec']} rows/sec)")
+
+def rebuild_bitmaps(args):
+    from app.services.bitmap_service import rebuild_all_bitmaps
+
+    start = time.time()
+    with Session(engine) as session:
+        result = rebuild_all_bitmaps(session, batch_size=args.batch_size)
+    print(f"Rebuilt {result['bitmaps']} task-year bitmap(s) from {result['rows']} log rows in {time.time() - start:.2f}s")
+
+def rebuild_analytics_rollups(args):
+    from app.services.analytics_service import rebuild_rollups
+    from app.services.retention_service import retention_cutoff
+    from app.core.config import ANALYTICS_RETENTION_DAYS
+
+    # Outside the retention window raw events may be partly purged, so only --all rebuilds from the oldest event
+    since = None if args.all or ANALYTICS_RETENTION_DAYS <= 0 else retention_cutoff()
+    start = time.time()
+    with Session(engine) as session:
+        result = rebuild_rollups(session, since)
+    print(f"Rebuilt {result['hours']} hourly and {result['days']} daily bucket(s) in {time.time() - start:.2f}s")
+
+def purge_analytics(args):
+    from app.services.retention_service import run_retention
+
+    start = time.time()
+    with Session(engine) as session:
+        result = run_retention(session, days=args.days, batch_size=args.batch_size)
+    print(f"Purged {result['events_deleted']} event(s) and {result['hourly_deleted']} hourly bucket(s) "
+          f"older than {result['cutoff']}, dropped partitions {result['partitions_dropped']}, "
+          f"created partitions {result['partitions_created']} in {time.time() - start:.2f}s")
+
+def partition_analytics(args):
+    from app.services.retention_service import partition_events_table
+
+    with Session(engine) as session:
+        print(partition_events_table(session, months_ahead=args.months_ahead))
+
+def train_relevance(args):
+    from app.ml.relevance_model import train_relevance_model
+
+    start = time.time()
+    result = train_relevance_model(args.csv, args.out)
+    if result["status"] != "success":
+        print(result["message"])
+        sys.exit(1)
+    print(f"Trained on {result['samples']} headline(s) ({result['relevant']} relevant), "
+          f"cross-validated accuracy {result['cv_accuracy']}, saved to {result['path']} in {time.time() - start:.2f}s")
+    print("Set NEWS_RELEVANCE_BACKEND=local and restart the app to use it")
+
+def bench_login(args):
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from passlib.context import CryptContext
+    from app.core.security import verify_password
+
+    password = "benchmark-password"
+    print(f"{args.logins} password verifications per configuration, {multiprocessing.cpu_count()} CPUs")
+    for rounds in args.rounds:
+        hashed = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(password)
+        for workers in args.workers:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                # Warm up so process start-up is not measured
+                list(pool.map(verify_password, [password] * workers, [hashed] * workers))
+                start = time.perf_counter()
+                list(pool.map(verify_password, [password] * args.logins, [hashed] * args.logins))
+                elapsed = time.perf_counter() - start
+            print(f"  BCRYPT_ROUNDS={rounds:<3} PASSWORD_HASH_WORKERS={workers:<3} "
+                  f"{args.logins / elapsed:8.1f} logins/sec  {elapsed / args.logins * workers * 1000:7.1f} ms per verify")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintenance commands for the Personal Execution Engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cmd = commands.add_parser("rebuild-stats", help="Recompute UserStats from Task/DailyLog/Reward")
+    cmd.add_argument("--user", type=int, help="Only rebuild this user id")
+    cmd.set_defaults(func=rebuild_stats)
+
+    cmd = commands.add_parser("refresh-leaderboard", help="Rebuild the community leaderboard snapshot now")
+    cmd.set_defaults(func=refresh_leaderboard)
+
+    cmd = commands.add_parser("rebuild-streaks", help="Recompute every Streak row from DailyLog history")
+    cmd.add_argument("--batch-size", type=int, default=5000, help="Log rows per page and tasks per write batch")
+    cmd.set_defaults(func=rebuild_streaks)
+
+    cmd = commands.add_parser("rebuild-bitmaps", help="Recompute every CompletionBitmap from DailyLog")
+    cmd.add_argument("--batch-size", type=int, default=5000, help="Log rows per page and bitmaps per write batch")
+    cmd.set_defaults(func=rebuild_bitmaps)
+
+    cmd = commands.add_parser("rebuild-analytics-rollups", help="Recompute the hourly/daily AnalyticsEvent rollups")
+    cmd.add_argument("--all", action="store_true", help="Rebuild from the oldest raw event, not just the retention window")
+    cmd.set_defaults(func=rebuild_analytics_rollups)
+
+    cmd = commands.add_parser("purge-analytics", help="Apply the AnalyticsEvent retention policy now")
+    cmd.add_argument("--days", type=int, default=ANALYTICS_RETENTION_DAYS, help="Keep raw events this many days (default: ANALYTICS_RETENTION_DAYS, 0 keeps everything)")
+    cmd.add_argument("--batch-size", type=int, default=ANALYTICS_PURGE_BATCH, help="Rows deleted per transaction")
+    cmd.set_defaults(func=purge_analytics)
+
+    cmd = commands.add_parser("partition-analytics", help="Convert AnalyticsEvent to monthly range partitions (Postgres)")
+    cmd.add_argument("--months-ahead", type=int, default=ANALYTICS_PARTITION_MONTHS_AHEAD, help="Future months to create")
+    cmd.set_defaults(func=partition_analytics)
+
+    cmd = commands.add_parser("train-relevance", help="Train the local news relevance model from labelled headlines")
+    cmd.add_argument("csv", help="CSV with title, summary (optional) and relevant (1/0) columns")
+    cmd.add_argument("--out", default=RELEVANCE_MODEL_PATH, help="Where to save the model")
+    cmd.set_defaults(func=train_relevance)
+
+    cmd = commands.add_parser("bench-login", help="Measure login (bcrypt verify) throughput per pool size and cost")
+    cmd.add_argument("--rounds", type=int, nargs="+", default=[10, 12], help="bcrypt cost factors to try")
+    cmd.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Process pool sizes to try")
+    cmd.add_argument("--logins", type=int, default=64, help="Verifications per configuration")
+    cmd.set_defaults(func=bench_login)
+
+    args = parser.parse_args(argv)
+    SQLModel.metadata.create_all(engine)
+    args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read at import time, so the test database is chosen before the app is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core import database
+
+database.engine.echo = False
+database.async_engine.echo = False
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture
+def auth_headers(client):
+    """
+    Registers a fresh user and returns its Authorization header.
+    """
+    r = client.post("/auth/register", json={"username": f"user-{uuid.uuid4().hex[:8]}", "password": "pw"})
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.analytics import AnalyticsEvent
+from app.models.analytics_rollup import AnalyticsHourly, AnalyticsDaily
+from app.services.analytics_service import backfill_rollups, event_totals, flush_events
+from app.services.retention_service import run_retention
+
+def test_rollups_are_backfilled_from_existing_events(client):
+    client.portal.call(flush_events)
+    old = datetime.utcnow() - timedelta(days=30)
+    with Session(engine) as session:
+        session.add_all([AnalyticsEvent(event_type="LEGACY", timestamp=old + timedelta(hours=i)) for i in range(5)])
+        # As on the first start after the rollups were introduced
+        session.exec(delete(AnalyticsHourly))
+        session.exec(delete(AnalyticsDaily))
+        session.commit()
+
+        raw = dict(session.exec(select(AnalyticsEvent.event_type, func.count()).group_by(AnalyticsEvent.event_type)).all())
+        assert backfill_rollups(session)
+        assert event_totals(session) == raw
+        assert raw["LEGACY"] == 5
+        # Only ever runs against empty rollups
+        assert backfill_rollups(session) is None
+
+def test_retention_is_off_by_default(client):
+    old = datetime.utcnow() - timedelta(days=400)
+    with Session(engine) as session:
+        session.add(AnalyticsEvent(event_type="ANCIENT", timestamp=old))
+        session.commit()
+        result = run_retention(session)
+        assert result["events_deleted"] == 0 and result["cutoff"] is None
+        assert session.exec(select(func.count()).where(AnalyticsEvent.event_type == "ANCIENT")).one() == 1
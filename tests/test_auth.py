@@ -0,0 +1,18 @@
+import os
+import signal
+import time
+
+from app.core import security
+
+def test_login_survives_a_dead_hash_worker(client):
+    assert client.post("/auth/register", json={"username": "crashy", "password": "pw"}).status_code == 200
+    rebuilds = security.hash_pool_stats()["pool_rebuilds"]
+
+    # A killed worker (e.g. by the OOM killer) breaks the whole process pool
+    os.kill(next(iter(security._hash_pool._processes)), signal.SIGKILL)
+    time.sleep(0.5)
+
+    r = client.post("/auth/login", data={"username": "crashy", "password": "pw"})
+    assert r.status_code == 200, r.text
+    assert security.hash_pool_stats()["pool_rebuilds"] == rebuilds + 1
+    assert client.post("/auth/login", data={"username": "crashy", "password": "pw"}).status_code == 200
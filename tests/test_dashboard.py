@@ -0,0 +1,21 @@
+from datetime import date
+
+def test_heatmap_year_bounds(client, auth_headers):
+    for year in (0, 10000):
+        assert client.get("/dashboard/heatmap", params={"year": year}, headers=auth_headers).status_code == 422
+    r = client.get("/dashboard/heatmap", params={"year": 9999}, headers=auth_headers)
+    assert r.status_code == 200 and r.json()["year"] == 9999
+    assert client.get("/dashboard/heatmap", headers=auth_headers).json()["year"] == date.today().year
+
+def test_heatmap_task_ownership_and_revalidation(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "Walk"}, headers=auth_headers).json()["id"]
+    client.post("/logs/", json={"task_id": task_id, "completed": True}, headers=auth_headers)
+
+    r = client.get("/dashboard/heatmap", params={"task_id": task_id}, headers=auth_headers)
+    assert r.status_code == 200 and r.json()["total"] == 1
+    r2 = client.get("/dashboard/heatmap", params={"task_id": task_id}, headers={**auth_headers, "If-None-Match": r.headers["etag"]})
+    assert r2.status_code == 304
+
+    other = client.post("/auth/register", json={"username": f"other-{task_id}", "password": "pw"}).json()["access_token"]
+    r = client.get("/dashboard/heatmap", params={"task_id": task_id}, headers={"Authorization": f"Bearer {other}"})
+    assert r.status_code == 404
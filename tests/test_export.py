@@ -0,0 +1,21 @@
+import gzip
+import json
+
+from app.services.export_service import iter_export, new_cursor
+
+def _export(tables, fmt, compress=False):
+    body = b"".join(iter_export(tables, fmt, new_cursor(), gzip=compress))
+    return (gzip.decompress(body) if compress else body).decode()
+
+def test_json_export_is_valid(client, auth_headers):
+    client.post("/tasks/", json={"title": "Export me"}, headers=auth_headers)
+    for tables in (["tasks"], ["tasks", "logs"], ["tasks", "tasks"], []):
+        data = json.loads(_export(tables, "json"))
+        assert "cursor" in data
+        assert set(data) - {"cursor"} == set(tables)
+    assert all("hashed_password" not in row for row in json.loads(_export(["users"], "json"))["users"])
+
+def test_ndjson_and_gzip(client, auth_headers):
+    client.post("/tasks/", json={"title": "Export me"}, headers=auth_headers)
+    lines = [json.loads(line) for line in _export(["users", "tasks"], "ndjson", compress=True).splitlines()]
+    assert {line["_table"] for line in lines} == {"users", "tasks"}
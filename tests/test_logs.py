@@ -0,0 +1,61 @@
+from datetime import date, datetime, timedelta
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.reward import Reward
+
+def _batch(client, headers, task_id, days, completed=True):
+    today = date.today()
+    r = client.post("/logs/batch", json=[
+        {"task_id": task_id, "log_date": str(today - timedelta(days=d)), "completed": completed} for d in days
+    ], headers=headers)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+def _rewards(task_id):
+    with Session(engine) as session:
+        return sorted(session.exec(select(Reward.value).where(Reward.task_id == task_id)).all())
+
+def test_batch_issues_milestones_once_per_run(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "Meditate"}, headers=auth_headers).json()["id"]
+
+    body = _batch(client, auth_headers, task_id, range(8))
+    assert body["streaks"][0]["current_streak"] == 8
+    assert _rewards(task_id) == [3, 7]
+
+    # Unchecking a mid-run day splits it: the new 4-day run earns its own 3-day bonus, once
+    body = _batch(client, auth_headers, task_id, [4], completed=False)
+    assert body["streaks"][0]["current_streak"] == 4
+    assert _rewards(task_id) == [3, 3, 7]
+
+    # Checking it again and repeating the toggle must not earn anything more
+    for _ in range(3):
+        _batch(client, auth_headers, task_id, [4], completed=True)
+        _batch(client, auth_headers, task_id, [4], completed=False)
+    _batch(client, auth_headers, task_id, [4], completed=True)
+    assert _rewards(task_id) == [3, 3, 7]
+
+def test_new_short_run_after_an_old_run_earns_its_bonus(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "Stretch"}, headers=auth_headers).json()["id"]
+
+    # An old 5-day run, synced today
+    _batch(client, auth_headers, task_id, range(36, 41))
+    assert _rewards(task_id) == [3]
+
+    body = _batch(client, auth_headers, task_id, range(3))
+    assert body["streaks"][0]["current_streak"] == 3
+    assert [r["value"] for r in body["rewards"]] == [3]
+    assert _rewards(task_id) == [3, 3]
+
+def test_new_short_run_after_a_live_logged_run(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "Journal"}, headers=auth_headers).json()["id"]
+    _batch(client, auth_headers, task_id, range(36, 41))
+    # As if the old run had been checked in day by day: its bonus was issued back then
+    with Session(engine) as session:
+        for reward in session.exec(select(Reward).where(Reward.task_id == task_id)):
+            reward.issued_at = datetime.utcnow() - timedelta(days=38)
+            session.add(reward)
+        session.commit()
+
+    body = _batch(client, auth_headers, task_id, range(3))
+    assert [r["value"] for r in body["rewards"]] == [3]
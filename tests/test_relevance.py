@@ -0,0 +1,56 @@
+import asyncio
+import httpx
+import pytest
+
+from app.services import news_service, relevance_service
+
+def _rss(titles):
+    items = "".join(f"<item><title>{t}</title><description>About {t}</description></item>" for t in titles)
+    return f"<rss><channel>{items}</channel></rss>".encode()
+
+@pytest.fixture
+def classifier(monkeypatch):
+    """
+    Local stand-in for the remote model: records each batch, keeps everything but 'Noise' headlines.
+    """
+    batches = []
+    def classify(texts):
+        batches.append(list(texts))
+        return [(not text.startswith("Noise"), 0.9) for text in texts]
+    monkeypatch.setattr(relevance_service, "classify_texts", classify)
+    relevance_service.relevance_cache.clear()
+    return batches
+
+def _refresh(titles):
+    async def run():
+        news_service._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=_rss(titles))))
+        try:
+            await news_service.refresh_news(["growth"])
+        finally:
+            await news_service.close_news_client()
+    asyncio.run(run())
+    return [item["title"] for item in news_service.NEWS_CACHE["growth"]["data"]]
+
+def test_one_batch_per_refresh_and_memo_hits(classifier):
+    titles = ["Habits 1", "Noise 1", "Habits 2", "Habits 3"]
+    assert _refresh(titles) == ["Habits 1", "Habits 2", "Habits 3"]
+    assert len(classifier) == 1 and len(classifier[0]) == 4
+
+    hits = relevance_service.relevance_cache.hits
+    # Only the new headline goes to the classifier; the rest are memo hits
+    assert _refresh(titles + ["Habits 4"]) == ["Habits 1", "Habits 2", "Habits 3", "Habits 4"]
+    assert [len(batch) for batch in classifier] == [4, 1]
+    assert relevance_service.relevance_cache.hits - hits == 4
+
+    _refresh(titles)
+    assert len(classifier) == 2 # nothing new, no classifier call
+
+def test_errors_keep_items_without_memoizing(monkeypatch, classifier):
+    def broken(texts):
+        raise RuntimeError("inference unavailable")
+    monkeypatch.setattr(relevance_service, "classify_texts", broken)
+    assert _refresh(["Noise 1", "Habits 1"]) == ["Noise 1", "Habits 1"]
+
+    # Once the classifier is back the same items are classified, not served from a memoized fallback
+    monkeypatch.setattr(relevance_service, "classify_texts", lambda texts: [(not t.startswith("Noise"), 0.9) for t in texts])
+    assert _refresh(["Noise 1", "Habits 1"]) == ["Habits 1"]
@@ -0,0 +1,60 @@
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+
+from app.core.cache import response_cache
+from app.core.database import async_engine
+from app.services.analytics_service import flush_events
+
+@contextmanager
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+def _get_tasks_queries(client, headers):
+    # The analytics writer shares the engine; nothing is left for it to write during the request
+    client.portal.call(flush_events)
+    with count_queries() as statements:
+        r = client.get("/tasks/", headers=headers)
+    assert r.status_code == 200, r.text
+    return len(r.json()), len(statements)
+
+def test_task_list_query_count_is_constant(client, auth_headers):
+    for i in range(3):
+        task_id = client.post("/tasks/", json={"title": f"Task {i}"}, headers=auth_headers).json()["id"]
+        client.post("/logs/", json={"task_id": task_id, "completed": True}, headers=auth_headers)
+    tasks, few = _get_tasks_queries(client, auth_headers)
+    assert tasks == 3
+
+    for i in range(3, 20):
+        task_id = client.post("/tasks/", json={"title": f"Task {i}"}, headers=auth_headers).json()["id"]
+        client.post("/logs/", json={"task_id": task_id, "completed": True}, headers=auth_headers)
+    tasks, many = _get_tasks_queries(client, auth_headers)
+    assert tasks == 20
+    assert many == few
+    assert few <= 2 # the task list itself, plus the user lookup on a user cache miss
+
+def test_task_list_is_served_from_cache(client, auth_headers):
+    client.post("/tasks/", json={"title": "Cached"}, headers=auth_headers)
+    _get_tasks_queries(client, auth_headers)
+    assert _get_tasks_queries(client, auth_headers) == (1, 0)
+
+def test_task_list_cache_expires(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(response_cache.entries, "ttl", 0.05)
+    client.post("/tasks/", json={"title": "Expiring"}, headers=auth_headers)
+    etag = client.get("/tasks/", headers=auth_headers).headers["etag"]
+    assert _get_tasks_queries(client, auth_headers) == (1, 0)
+
+    # Once expired the body is rebuilt, but an unchanged list keeps its ETag
+    time.sleep(0.1)
+    client.portal.call(flush_events)
+    with count_queries() as statements:
+        r = client.get("/tasks/", headers={**auth_headers, "If-None-Match": etag})
+    assert r.status_code == 304
+    assert len(statements) == 1